@@ -1,37 +1,265 @@
-import sys
 import os
-from pdf2image import convert_from_path
+import re
+import json
+import argparse
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pdf2image import convert_from_path, pdfinfo_from_path
 import pytesseract
 from PIL import Image
+from ocr_cache import file_sha256, page_cache_key, cache_get, cache_put, evict_lru, DEFAULT_MAX_BYTES
 
 # ✅ Usage:
 # python ocr_script.py "input.pdf" "output.txt"
+# python ocr_script.py "input.pdf" "output.txt" --workers 8
+# python ocr_script.py "input.pdf" "output.txt" --workers 1 --chunk-size 4
+# python ocr_script.py "input.pdf" "output.txt" --no-text-layer
+# python ocr_script.py "input.pdf" "output.txt" --cache-dir "D:\ocr_cache"
 
 # --- Configuration ---
 poppler_path = r"C:\Users\asus\AppData\Local\Microsoft\WinGet\Packages\oschwartz10612.Poppler_Microsoft.Winget.Source_8wekyb3d8bbwe\poppler-25.07.0\Library\bin"
 tesseract_path = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 pytesseract.pytesseract.tesseract_cmd = tesseract_path
+ocr_cache_dir = r"C:\Users\asus\OneDrive\Desktop\NLP\MiniProject\OCR_Outputs\ocr_cache"
 
-def perform_ocr(input_pdf, output_txt):
+# version of this stage's output: bump it whenever a change alters the text it
+# produces, so `pipeline.py --incremental` reruns the stage (and the ones after it)
+STAGE_VERSION = 1
+
+OCR_DPI = 300
+OCR_LANG = "hin+eng"
+# pages rasterized at once in sequential mode (one 300 DPI page is ~25 MB as a PIL image)
+OCR_CHUNK_PAGES = 8
+
+# a page's embedded text is trusted only if it has at least this many Hindi/English letters
+MIN_TEXT_LAYER_CHARS = 100
+RE_SCRIPT_CHAR = re.compile(r'[A-Za-z\u0900-\u097F]')
+
+
+def _init_ocr_worker():
+    # one Tesseract per core: stop each process from spawning its own OpenMP threads
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _ocr_single_page(input_pdf, page_num):
+    """
+    Rasterize and OCR one page (1-based). Runs inside a worker process,
+    so only the page number crosses the process boundary, never the image.
+    """
+    images = convert_from_path(input_pdf, dpi=OCR_DPI, first_page=page_num,
+                               last_page=page_num, poppler_path=poppler_path)
+    return pytesseract.image_to_string(images[0], lang=OCR_LANG)
+
+
+def _extract_text_layer(input_pdf):
+    """
+    Read the embedded text of every page with poppler's pdftotext.
+    Returns one string per page, or an empty list if there is no usable tool/layer.
+    """
+    exe = os.path.join(poppler_path, "pdftotext") if poppler_path else "pdftotext"
+    try:
+        result = subprocess.run([exe, "-layout", "-enc", "UTF-8", input_pdf, "-"],
+                                capture_output=True)
+    except OSError as e:
+        print(f"⚠️ pdftotext not available, OCR-ing every page: {e}")
+        return []
+    if result.returncode != 0:
+        return []
+    # pdftotext ends every page with a form feed
+    return result.stdout.decode("utf-8", errors="replace").split("\f")
+
+
+def _iter_page_images(input_pdf, page_nums, chunk_size):
+    """
+    Yield (page_num, image) pairs for the given sorted page numbers, rasterizing
+    at most chunk_size consecutive pages at a time through first_page/last_page
+    windows. Peak memory stays at one chunk however long the PDF is.
+    chunk_size <= 0 rasterizes the whole PDF at once.
+    """
+    if chunk_size <= 0:
+        wanted = set(page_nums)
+        pages = convert_from_path(input_pdf, dpi=OCR_DPI, poppler_path=poppler_path)
+        for i, page in enumerate(pages):
+            if i + 1 in wanted:
+                yield i + 1, page
+        return
+
+    # group the pages into runs of consecutive numbers, each at most chunk_size long
+    windows = []
+    for page_num in page_nums:
+        if windows and page_num == windows[-1][1] + 1 and page_num - windows[-1][0] < chunk_size:
+            windows[-1][1] = page_num
+        else:
+            windows.append([page_num, page_num])
+
+    for first, last in windows:
+        chunk = convert_from_path(input_pdf, dpi=OCR_DPI, first_page=first,
+                                  last_page=last, poppler_path=poppler_path)
+        for offset in range(len(chunk)):
+            # drop our reference as we go so each image can be freed right after OCR
+            page, chunk[offset] = chunk[offset], None
+            yield first + offset, page
+        del chunk
+
+
+def _join_pages(page_texts):
+    """
+    Build the OCR dump in page order, in the same "--- Page N ---" layout
+    the later stages expect.
+    """
+    all_text = ""
+    for i, text in enumerate(page_texts):
+        all_text += f"\n\n--- Page {i+1} ---\n\n{text.strip()}"
+    return all_text
+
+
+def _ocr_pages_parallel(input_pdf, page_nums, workers):
+    """
+    OCR the given pages on a process pool and return {page_num: text}.
+    A failed page is logged and left empty so the pages that succeeded are still written.
+    """
+    page_texts = {}
+    failed = []
+
+    print(f"⚡ OCR of {len(page_nums)} pages on {workers} workers...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_ocr_worker) as pool:
+        futures = {
+            pool.submit(_ocr_single_page, input_pdf, page_num): page_num
+            for page_num in page_nums
+        }
+        done = 0
+        for future in as_completed(futures):
+            page_num = futures[future]
+            done += 1
+            try:
+                page_texts[page_num] = future.result()
+                print(f"🔍 Processed page {page_num} ({done}/{len(page_nums)})")
+            except Exception as e:
+                failed.append(page_num)
+                page_texts[page_num] = ""
+                print(f"⚠️ OCR failed on page {page_num}: {e}")
+
+    if failed:
+        print(f"⚠️ {len(failed)} page(s) failed and were left empty: {sorted(failed)}")
+    return page_texts
+
+
+def _ocr_pages_sequential(input_pdf, page_nums, chunk_size):
+    """
+    OCR the given pages one by one in this process and return {page_num: text}.
+    """
+    print("🔄 Converting PDF to images...")
+    page_texts = {}
+    for page_num, page in _iter_page_images(input_pdf, page_nums, chunk_size):
+        print(f"🔍 Processing page {page_num}...")
+        try:
+            page_texts[page_num] = pytesseract.image_to_string(page, lang=OCR_LANG)
+        except Exception as e:
+            print(f"⚠️ OCR failed on page {page_num}: {e}")
+            page_texts[page_num] = ""
+        del page
+    return page_texts
+
+
+def ocr_pdf_text(input_pdf, workers=1, chunk_size=OCR_CHUNK_PAGES, use_text_layer=True,
+                 cache_dir=ocr_cache_dir, cache_max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Read a PDF into the "--- Page N ---" text dump without touching the output folder.
+    Returns (all_text, page_sources), page_sources recording where each page's text came from.
+    """
+    total_pages = pdfinfo_from_path(input_pdf, poppler_path=poppler_path)["Pages"]
+    page_texts = [""] * total_pages
+
+    # Born-digital pages already carry text: take it and only OCR the rest
+    text_layer = _extract_text_layer(input_pdf) if use_text_layer else []
+    page_sources = []
+    ocr_pages = []
+    for page_num in range(1, total_pages + 1):
+        layer_text = text_layer[page_num - 1] if page_num <= len(text_layer) else ""
+        script_chars = len(RE_SCRIPT_CHAR.findall(layer_text))
+        if script_chars >= MIN_TEXT_LAYER_CHARS:
+            page_texts[page_num - 1] = layer_text
+            source = "text_layer"
+        else:
+            ocr_pages.append(page_num)
+            source = "ocr"
+        page_sources.append({"page": page_num, "source": source, "text_layer_chars": script_chars})
+
+    if use_text_layer:
+        print(f"📄 {total_pages - len(ocr_pages)}/{total_pages} pages have a usable text layer, "
+              f"{len(ocr_pages)} need OCR.")
+
+    # Pages OCR'd before (same PDF bytes, DPI, language and Tesseract) come from the cache
+    page_keys = {}
+    if cache_dir and ocr_pages:
+        pdf_hash = file_sha256(input_pdf)
+        engine_version = str(pytesseract.get_tesseract_version())
+        still_needed = []
+        for page_num in ocr_pages:
+            key = page_cache_key(pdf_hash, page_num, OCR_DPI, OCR_LANG, engine_version)
+            cached = cache_get(cache_dir, key)
+            if cached is None:
+                page_keys[page_num] = key
+                still_needed.append(page_num)
+            else:
+                page_texts[page_num - 1] = cached
+                page_sources[page_num - 1]["source"] = "ocr_cache"
+        print(f"🗃️ {len(ocr_pages) - len(still_needed)}/{len(ocr_pages)} OCR pages found in cache.")
+        ocr_pages = still_needed
+
+    if ocr_pages:
+        if workers > 1:
+            ocr_texts = _ocr_pages_parallel(input_pdf, ocr_pages, workers)
+        else:
+            ocr_texts = _ocr_pages_sequential(input_pdf, ocr_pages, chunk_size)
+        for page_num, text in ocr_texts.items():
+            page_texts[page_num - 1] = text
+            # failed pages come back empty; don't cache them so a rerun retries them
+            if page_num in page_keys and text:
+                cache_put(cache_dir, page_keys[page_num], text)
+
+    if page_keys:
+        evicted = evict_lru(cache_dir, cache_max_bytes)
+        if evicted:
+            print(f"🗑️ Evicted {evicted} old cache entries.")
+
+    if total_pages and not any(text.strip() for text in page_texts):
+        raise RuntimeError(f"no text could be read from any of the {total_pages} pages")
+
+    all_text = _join_pages(page_texts)
+    return all_text, page_sources
+
+
+def page_sources_path(output_txt):
+    """
+    Where the per-page text-layer/OCR decisions of an OCR output are saved: <base>_pages.json.
+    """
+    return os.path.splitext(output_txt)[0] + "_pages.json"
+
+
+def perform_ocr(input_pdf, output_txt, workers=1, chunk_size=OCR_CHUNK_PAGES, use_text_layer=True,
+                cache_dir=ocr_cache_dir, cache_max_bytes=DEFAULT_MAX_BYTES):
     try:
         # Check input file
         if not os.path.exists(input_pdf):
             print(f"❌ Error: Input file not found: {input_pdf}")
             return
-        
-        # Convert PDF to images
-        print("🔄 Converting PDF to images...")
-        pages = convert_from_path(input_pdf, dpi=300, poppler_path=poppler_path)
 
-        all_text = ""
-        for i, page in enumerate(pages):
-            print(f"🔍 Processing page {i+1}/{len(pages)}...")
-            text = pytesseract.image_to_string(page, lang="hin+eng")
-            all_text += f"\n\n--- Page {i+1} ---\n\n{text.strip()}"
+        all_text, page_sources = ocr_pdf_text(input_pdf, workers=workers, chunk_size=chunk_size,
+                                              use_text_layer=use_text_layer, cache_dir=cache_dir,
+                                              cache_max_bytes=cache_max_bytes)
 
-        # Save output
-        with open(output_txt, "w", encoding="utf-8") as f:
+        # Save output (temp file + rename, so a killed run never leaves a half-written .txt
+        # that the orchestrators would treat as done)
+        tmp_output = output_txt + ".part"
+        with open(tmp_output, "w", encoding="utf-8") as f:
             f.write(all_text)
+        os.replace(tmp_output, output_txt)
+
+        # Save the per-page text-layer/OCR decision next to the output for auditing
+        sources_path = page_sources_path(output_txt)
+        with open(sources_path, "w", encoding="utf-8") as f:
+            json.dump(page_sources, f, ensure_ascii=False, indent=4)
 
         print(f"✅ OCR complete! Text saved to:\n{output_txt}")
 
@@ -40,11 +268,24 @@ def perform_ocr(input_pdf, output_txt):
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("⚠️ Usage: python ocr_script.py <input_pdf_path> <output_txt_path>")
-        sys.exit(1)
-    
-    input_pdf = sys.argv[1]
-    output_txt = sys.argv[2]
-    
-    perform_ocr(input_pdf, output_txt)
+    parser = argparse.ArgumentParser(description="OCR a debate PDF into a page-marked text file.")
+    parser.add_argument("input_pdf", help="path of the PDF to read")
+    parser.add_argument("output_txt", help="path of the text file to write")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of pages to OCR in parallel (default: all cores, 1 = sequential)")
+    parser.add_argument("--chunk-size", type=int, default=OCR_CHUNK_PAGES,
+                        help="pages rasterized at once in sequential mode (0 = whole PDF at once)")
+    parser.add_argument("--no-text-layer", action="store_true",
+                        help="always OCR, even pages that already carry embedded text")
+    parser.add_argument("--cache-dir", default=ocr_cache_dir,
+                        help="folder of the page-level OCR cache")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="neither read nor write the OCR cache")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="evict least recently used cache entries above this size")
+    args = parser.parse_args()
+
+    perform_ocr(args.input_pdf, args.output_txt, workers=args.workers,
+                chunk_size=args.chunk_size, use_text_layer=not args.no_text_layer,
+                cache_dir=None if args.no_cache else args.cache_dir,
+                cache_max_bytes=args.cache_max_mb * 1024 * 1024)
@@ -1,11 +1,232 @@
-import sys
 import os
 import re
+import argparse
+import importlib
 
 # ✅ Usage:
 # python extract_debate.py "input.txt" "output.txt"
+# python extract_debate.py "fullday.txt" "output.txt" --all-debates
 
-def extract_debate(file_path, output_path):
+STAGE_VERSION = 1  # bump when the cropped text changes (see pipeline.stage_versions)
+
+INTERRUPTION_MARKERS = ("(Interruptions)", "(व्यवधान)")
+END_MARKERS = ("(Ends)", "समाप्त")
+
+RE_PAGE_HEADER = re.compile(r"--- Page.*---")
+RE_INTERRUPTION = re.compile(r"\(Interruptions\)|\(व्यवधान\)")
+RE_PAGE_NUMBER = re.compile(r"--- Page (\d+) ---")
+
+# Multi-debate mode. A speech is closed by a whole "(Ends)" / "(समाप्त)" marker
+# (also written "( समाप्त)"); a bare समाप्त inside a sentence is not a marker.
+RE_END_MARKER = re.compile(r"\(\s*(?:Ends|समाप्त)\s*\)")
+# reporter hand-over notes: "(Contd. by KSK/D)", "(th/ASC पर आगे)", "(4b/ VNK-SKC पर जारी)"
+RE_CONTINUED_NOTE = re.compile(r"\(\s*Contd\.?\s+by[^()\n]*\)|\([^()\n]*पर\s+(?:आगे|जारी)\s*\)")
+# speaker head of the same speech running on after a hand-over: "MR. DEPUTY CHAIRMAN (CONTD.):"
+RE_CONTINUED_HEAD = re.compile(r"\(\s*CONTD\.?\s*\)\s*:")
+# upper-case topic heading opening a Zero Hour mention ("PROBLEM OF BONDED LABOUR IN INDIA")
+RE_TOPIC_HEADING = re.compile(r"(?=[^a-z:/]*[A-Z]{3})[A-Z][A-Z0-9 ,.'&()-]*")
+# "I associate myself with ...", "मैं स्वयं को इस विषय के साथ सम्बद्ध करता हूँ"
+RE_ASSOCIATION = re.compile(r"associat|सम्बद्ध|संबद्ध|एसोसिएट", re.IGNORECASE)
+# "(KERALA)" / "(CONTD.)" after a speaker name
+RE_PARENTHESIZED = re.compile(r"\s*\([^()\n]*\)")
+RE_CHAIR = re.compile(r"(?:MR\.|THE)\s+(?:DEPUTY\s+)?CHAIRMAN|उपसभापति|सभापति")
+# markers dropped from the text of every block
+RE_BLOCK_MARKERS = re.compile(rf"{RE_INTERRUPTION.pattern}|{RE_END_MARKER.pattern}|{RE_CONTINUED_NOTE.pattern}")
+ASSOCIATION_WINDOW = 200  # chars of a speech searched for RE_ASSOCIATION
+MIN_MENTION_CHARS = 200   # shorter speeches after an end marker are interjections
+
+speaker_wise = importlib.import_module("4_speaker_wise")
+
+
+def find_debate_start(text):
+    """
+    Position where the debate starts: just after the last "(Ends)"/"समाप्त" that
+    precedes the first interruption marker; 0 if either marker is missing.
+    Plain forward/reverse substring searches, no regex over the prefix.
+    """
+    hits = [pos for pos in (text.find(m) for m in INTERRUPTION_MARKERS) if pos != -1]
+    if not hits:
+        return 0
+    first_interrupt_pos = min(hits)
+
+    # Trace backward to find the last "(Ends)" or "समाप्त" before this
+    start_pos = 0  # fallback to start if no end marker found
+    for marker in END_MARKERS:
+        pos = text.rfind(marker, 0, first_interrupt_pos)
+        if pos != -1:
+            start_pos = max(start_pos, pos + len(marker))
+    return start_pos
+
+
+def _crop_span(text, lo, hi, markers=RE_INTERRUPTION):
+    """
+    Cropping engine shared by both modes: clean text[lo:hi] in a single scan
+    over its lines (no slice of the input is taken). `markers` are removed
+    from every line.
+    """
+    # bounds of text[lo:hi].strip(), without copying
+    while lo < hi and text[lo].isspace():
+        lo += 1
+    while hi > lo and text[hi - 1].isspace():
+        hi -= 1
+
+    pieces = []           # output, joined once at the end
+    logical = []          # parts of the current line ("Uncorrected..." cuts join it with the next one)
+    blank_gap = False     # whitespace-only lines seen since the last kept line
+    pos = lo
+    while pos < hi:
+        nl = text.find("\n", pos, hi)
+        line = text[pos:hi] if nl == -1 else text[pos:nl]
+        pos = hi if nl == -1 else nl + 1
+
+        # remove page headers
+        if "--- Page" in line:
+            line = RE_PAGE_HEADER.sub("", line)
+        # "Uncorrected..." up to and including the newline: the line continues on the next one
+        cut = line.find("Uncorrected") if nl != -1 else -1
+        if cut != -1:
+            logical.append(line[:cut])
+            continue
+        logical.append(line)
+        line = "".join(logical) if len(logical) > 1 else logical[0]
+        logical = []
+
+        # remove interruption markers from debate
+        if "(" in line:
+            line = markers.sub("", line)
+
+        # runs of blank lines collapse to one empty line between kept lines
+        if not line or line.isspace():
+            blank_gap = True
+            continue
+        if pieces:
+            pieces.append("\n\n" if blank_gap else "\n")
+        else:
+            line = line.lstrip()
+        pieces.append(line)
+        blank_gap = False
+
+    if pieces:
+        pieces[-1] = pieces[-1].rstrip()
+    return "".join(pieces)
+
+
+def crop_debate_text(text):
+    """
+    Cut the debate out of a raw OCR dump and strip page headers,
+    "Uncorrected" lines, interruption markers and blank-line runs.
+
+    Single scan over the lines of the debate, building the output once. Gives the
+    same result as the sequential passes it replaces:
+        strip → sub("--- Page.*---") → sub("Uncorrected.*\\n") → sub(interruptions)
+        → sub("\\n\\s*\\n", "\\n\\n") → strip
+    """
+    return _crop_span(text, find_debate_start(text), len(text))
+
+
+def _skip_page_furniture(text, pos, page):
+    """
+    Skip whitespace, page headers and "Uncorrected..." lines from pos.
+    Returns (position of the next real content, page number at that point).
+    """
+    while True:
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        header = RE_PAGE_NUMBER.match(text, pos)
+        if header:
+            page = int(header.group(1))
+            pos = header.end()
+        elif text.startswith("Uncorrected", pos):
+            nl = text.find("\n", pos)
+            pos = len(text) if nl == -1 else nl + 1
+        else:
+            return pos, page
+
+
+def _find_next_mention(text, pos, limit):
+    """
+    Where the next debate starts after an end marker: the first topic heading, or
+    the first speech in text[pos:limit] that opens a new mention. What comes before
+    it still belongs to the closed debate: the chair's remarks, the members
+    associating themselves with the mention, short interjections, "(CONTD.):"
+    heads of a speech carried over to the next reporter, page numbers and
+    hand-over notes. Returns None if there is no new mention before limit.
+    """
+    candidate = None  # start of the last speech that may open a new mention
+    associated = set()  # members who associated themselves; they may speak on
+    while pos < limit:
+        nl = text.find("\n", pos, limit)
+        line_end = limit if nl == -1 else nl
+        line = text[pos:line_end].strip()
+        heading = RE_TOPIC_HEADING.fullmatch(line)
+        head = heading or speaker_wise.RE_SPEAKER_HEAD.match(line) or RE_CHAIR.match(line)
+        if head and candidate is not None:
+            if pos - candidate >= MIN_MENTION_CHARS:
+                return candidate
+            candidate = None  # an interjection
+        if heading:
+            return pos
+        if head and not (RE_CHAIR.match(line) or RE_CONTINUED_HEAD.search(line)):
+            name = RE_PARENTHESIZED.sub("", head.group()).rstrip(": ")
+            if RE_ASSOCIATION.search(text, pos, min(limit, pos + ASSOCIATION_WINDOW)):
+                associated.add(name)
+            elif name not in associated:
+                candidate = pos
+        pos = line_end + 1
+    if candidate is not None and limit - candidate >= MIN_MENTION_CHARS:
+        return candidate
+    return None
+
+
+def iter_debate_blocks(text):
+    """
+    Multi-debate mode for full-day transcripts: yield every debate block, in order,
+    as soon as its end is found, instead of only the tail after the first interruption.
+
+    The first block starts at the beginning of the file (debates before the first
+    interruption are kept). After every "(Ends)"/"(समाप्त)" marker the block runs on
+    over the associations and chair remarks that follow, up to the heading or
+    speaker head of the next mention (see _find_next_mention); a marker followed
+    by another closed speech before any new mention is not a cut. Markers,
+    interruptions and reporter hand-over notes are removed from the block text.
+    Each block is yielded as
+        {"debate": n, "start_page": first page, "end_page": last page, "text": cropped text}
+    Page numbers come from the "--- Page N ---" headers (0 before the first header).
+    """
+    block_start = 0
+    page = 0
+    page_pos = 0  # headers before page_pos are already counted in page
+
+    def page_at(pos):
+        nonlocal page, page_pos
+        for header in RE_PAGE_NUMBER.finditer(text, page_pos, pos):
+            page = int(header.group(1))
+        page_pos = max(page_pos, pos)
+        return page
+
+    number = 0
+    markers = list(RE_END_MARKER.finditer(text))
+    for i, end in enumerate(markers):
+        limit = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+        cut = _find_next_mention(text, end.end(), limit)
+        if cut is None:
+            continue
+
+        _, start_page = _skip_page_furniture(text, block_start, page_at(block_start))
+        cropped = _crop_span(text, block_start, cut, RE_BLOCK_MARKERS)
+        if cropped:
+            number += 1
+            yield {"debate": number, "start_page": start_page, "end_page": page_at(end.start()), "text": cropped}
+        block_start = cut
+
+    # whatever follows the last cut is the last (possibly unfinished) debate
+    _, start_page = _skip_page_furniture(text, block_start, page_at(block_start))
+    cropped = _crop_span(text, block_start, len(text), RE_BLOCK_MARKERS)
+    if cropped:
+        yield {"debate": number + 1, "start_page": start_page, "end_page": page_at(len(text)), "text": cropped}
+
+
+def extract_debate(file_path, output_path, all_debates=False):
     try:
         # Check input file
         if not os.path.exists(file_path):
@@ -16,41 +237,26 @@ def extract_debate(file_path, output_path):
         with open(file_path, "r", encoding="utf-8") as f:
             text = f.read()
 
-        print("🔍 Extracting debate content...")
-        # Find the first interruption
-        interruption_match = re.search(r"\(Interruptions\)|\(व्यवधान\)", text)
-        
-        if interruption_match:
-            first_interrupt_pos = interruption_match.start()
-
-            # Trace backward to find the last "(Ends)" or "समाप्त" before this
-            pre_text = text[:first_interrupt_pos]
-            last_end_match = list(re.finditer(r"\(Ends\)|समाप्त", pre_text))
-            if last_end_match:
-                start_pos = last_end_match[-1].end()
-            else:
-                start_pos = 0  # fallback to start if no end marker found
-
-            # Extract debate text
-            debate_text = text[start_pos:].strip()
-        else:
-            # fallback: entire text if no interruptions
-            debate_text = text.strip()
-
-        print("🧹 Cleaning debate text...")
-        # Optional: remove page headers
-        debate_text = re.sub(r"--- Page.*---", "", debate_text)
-        debate_text = re.sub(r"Uncorrected.*\n", "", debate_text)
-
-        # Remove interruption markers from debate
-        debate_text = re.sub(r"\(Interruptions\)|\(व्यवधान\)", "", debate_text)
+        if all_debates:
+            # one output file per debate block: output_1.txt, output_2.txt, ...
+            print("🔍 Extracting every debate block...")
+            stem, ext = os.path.splitext(output_path)
+            count = 0
+            for block in iter_debate_blocks(text):
+                block_path = f"{stem}_{block['debate']}{ext}"
+                with open(block_path, "w", encoding="utf-8") as f:
+                    f.write(block["text"])
+                count += 1
+                print(f"✅ Debate {block['debate']} (pages {block['start_page']}-{block['end_page']}) saved to:\n{block_path}")
+            print(f"✅ Extracted {count} debate blocks.")
+            return
 
-        # Remove extra blank lines
-        debate_text = re.sub(r"\n\s*\n", "\n\n", debate_text)
+        print("🔍 Extracting and cleaning debate content...")
+        debate_text = crop_debate_text(text)
 
         # Save cleaned debate
         with open(output_path, "w", encoding="utf-8") as f:
-            f.write(debate_text.strip())
+            f.write(debate_text)
 
         print(f"✅ Debate extraction complete! Text saved to:\n{output_path}")
 
@@ -59,11 +265,11 @@ def extract_debate(file_path, output_path):
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("⚠️ Usage: python extract_debate.py <input_txt_path> <output_txt_path>")
-        sys.exit(1)
-    
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
-    
-    extract_debate(input_file, output_file)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Cut the debate text out of an OCR dump.")
+    parser.add_argument("input_txt_path")
+    parser.add_argument("output_txt_path")
+    parser.add_argument("--all-debates", action="store_true",
+                        help="full-day transcripts: write every debate block to <output>_<n>.txt")
+    args = parser.parse_args()
+
+    extract_debate(args.input_txt_path, args.output_txt_path, all_debates=args.all_debates)
@@ -4,39 +4,145 @@
 
 # ✅ Usage:
 # python 4_speaker_wise.py "input.txt" "output.json"
+# python 4_speaker_wise.py "input.txt" "output.jsonl"        (JSON Lines, streamed)
+# python 4_speaker_wise.py "input.txt" - | python 5_object_making.py - "output.jsonl"
 
 import sys
 import os
+import io
 import re
 import json
 
+from jsonl_io import is_jsonl, write_jsonl
+
+# Every honorific a speech can open with. One alternation (longest first) is compiled
+# from these and used both to cut speeches and to read the speaker name.
+HINDI_TITLES = ("श्री", "सुश्री", "श्रीमती", "डॉ.", "डॉ", "कुमारी", "प्रो.", "प्रो")
+ENGLISH_TITLES = ("MR.", "MS.", "MRS.", "DR.", "PROF.", "SHRI", "SHRIMATI", "SMT.", "KUMARI")
+# undotted titles that also begin ordinary words (प्रोजेक्ट, डॉलर, ...): only a title
+# when followed by whitespace
+WORD_PREFIX_TITLES = ("डॉ", "प्रो", "कुमारी", "KUMARI")
+
+STAGE_VERSION = 1  # bump when the speech segments change (see pipeline.stage_versions)
+
+MAX_SPEAKER_CHARS = 100
+MIN_SPEECH_WORDS = 6
+
+_TITLES = "|".join(re.escape(t) + (r"(?=\s)" if t in WORD_PREFIX_TITLES else "")
+                   for t in sorted(HINDI_TITLES + ENGLISH_TITLES, key=len, reverse=True))
+RE_SPEAKER_TITLE = re.compile(rf"(?:{_TITLES})")
+RE_SPEECH_START = re.compile(rf"\n(?=(?:{_TITLES}))")
+# title + name up to the first colon, on the first line
+RE_SPEAKER_HEAD = re.compile(rf"(?:{_TITLES})[^:\n]*:")
+
+
+def iter_speech_segments(raw_text):
+    """
+    Single pass over a cleaned debate: cut before every speaker title at a line
+    start and read the speaker off each segment while it is at hand.
+    Yields one dict per speech (fragments under MIN_SPEECH_WORDS words are dropped):
+        text          the stripped segment
+        start, end    its offsets in raw_text (character offsets)
+        speaker       "TITLE NAME" before the first colon, or None if the segment
+                      does not open with "TITLE NAME:" (stage 5 then detects it itself)
+        speaker_span  [start, end] of the speaker inside text, or None
+        speech_start  offset in text where the speech starts (after the colon), or 0
+    """
+    pos = 0
+    for cut in RE_SPEECH_START.finditer(raw_text):
+        segment = _make_segment(raw_text[pos:cut.start()], pos)
+        if segment:
+            yield segment
+        pos = cut.end()
+    segment = _make_segment(raw_text[pos:], pos)
+    if segment:
+        yield segment
+
+
+def iter_speech_segments_from_lines(lines):
+    """
+    Same segments as iter_speech_segments, read from an iterable of lines (e.g. an
+    open file), so only the speech being built is held in memory.
+    """
+    parts = []      # lines of the current segment
+    seg_start = 0   # offset of the current segment in the whole text
+    pos = 0         # offset of the current line
+    for line in lines:
+        # a cut is a newline followed by a title, i.e. a title at the start of any line but the first
+        if pos and RE_SPEAKER_TITLE.match(line) and parts[-1].endswith("\n"):
+            segment = _make_segment("".join(parts)[:-1], seg_start)
+            if segment:
+                yield segment
+            parts = []
+            seg_start = pos
+        parts.append(line)
+        pos += len(line)
+    segment = _make_segment("".join(parts), seg_start)
+    if segment:
+        yield segment
+
+
+def _make_segment(seg, lo):
+    text = seg.strip()
+    # count words once, and stop counting at MIN_SPEECH_WORDS
+    if len(text.split(None, MIN_SPEECH_WORDS - 1)) < MIN_SPEECH_WORDS:
+        return None
+    start = lo + (len(seg) - len(seg.lstrip()))
+
+    speaker, speaker_span, speech_start = None, None, 0
+    head = RE_SPEAKER_HEAD.match(text)
+    if head:
+        name = text[:head.end() - 1].strip()
+        if len(name) < MAX_SPEAKER_CHARS:
+            speaker, speaker_span, speech_start = name, [0, len(name)], head.end()
+
+    return {"text": text, "start": start, "end": start + len(text),
+            "speaker": speaker, "speaker_span": speaker_span, "speech_start": speech_start}
+
+
+def split_speeches(raw_text):
+    """
+    Split a cleaned debate into one string per speech, cutting before every
+    speaker title (HINDI_TITLES / ENGLISH_TITLES) at a line start.
+    Fragments of 5 words or fewer are dropped.
+    """
+    return [segment["text"] for segment in iter_speech_segments(raw_text)]
+
+
 def segment_speeches(file_path, output_path):
+    use_stdin = file_path == "-"
+    use_stdout = output_path == "-"
+    # status messages must not end up inside the JSON Lines when they go to stdout
+    log = sys.stderr if use_stdout else sys.stdout
     try:
         # Check input file
-        if not os.path.exists(file_path):
-            print(f"❌ Error: Input file not found: {file_path}")
+        if not use_stdin and not os.path.exists(file_path):
+            print(f"❌ Error: Input file not found: {file_path}", file=log)
             return
         
-        print(f"🔄 Reading file: {file_path}")
-        # Read the text file
-        with open(file_path, "r", encoding="utf-8") as f:
-            raw_text = f.read()
-
-        print("✅ File loaded successfully.")
-        print(f"📊 Total characters: {len(raw_text)}")
-
-        # -----------------------------------------------
-        # Detect and split by speaker names
-        # Speaker markers typically look like:
-        # "श्री", "सुश्री", "श्रीमती", "MR.", "SHRI", etc.
-        # -----------------------------------------------
-        print("🔍 Segmenting speeches by speaker markers...")
-        
-        # Use regex to split speeches by these markers (while keeping the speaker name)
-        segments = re.split(r"\n(?=(?:श्री|सुश्री|श्रीमती|MR\.|SHRI|MS\.))", raw_text)
+        print(f"🔄 Reading file: {'stdin' if use_stdin else file_path}", file=log)
+        if use_stdin:
+            inf = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+        else:
+            inf = open(file_path, "r", encoding="utf-8")
+
+        with inf:
+            # -----------------------------------------------
+            # Detect and split by speaker names
+            # Speaker markers typically look like:
+            # "श्री", "सुश्री", "श्रीमती", "MR.", "SHRI", etc.
+            # -----------------------------------------------
+            print("🔍 Segmenting speeches by speaker markers...", file=log)
+            segments = iter_speech_segments_from_lines(inf)
+
+            if is_jsonl(output_path):
+                # JSON Lines: each speech is written as soon as it is cut
+                print(f"💾 Streaming speeches to: {'stdout' if use_stdout else output_path}", file=log)
+                count = write_jsonl(output_path, segments)
+                print(f"✅ Done! {count} speeches saved to:\n{'stdout' if use_stdout else output_path}", file=log)
+                return
 
-        # Remove extra whitespace and filter out tiny fragments
-        speeches = [seg.strip() for seg in segments if len(seg.strip().split()) > 5]
+            speeches = list(segments)
 
         print(f"✅ Extracted {len(speeches)} speeches.")
 
@@ -44,7 +150,8 @@ def segment_speeches(file_path, output_path):
         print("\n📝 Preview of first 3 speeches:")
         for i, s in enumerate(speeches[:3]):
             print(f"\n--- Speech {i+1} ---")
-            print(f"{s[:400]}...")
+            print(f"🎙️ Speaker: {s['speaker'] or 'not found'}")
+            print(f"{s['text'][:400]}...")
             print()
 
         # Save to JSON
@@ -55,7 +162,7 @@ def segment_speeches(file_path, output_path):
         print(f"✅ Done! Speeches saved to:\n{output_path}")
 
     except Exception as e:
-        print(f"❌ Error during speech segmentation: {e}")
+        print(f"❌ Error during speech segmentation: {e}", file=log)
 
 
 if __name__ == "__main__":
@@ -66,4 +173,4 @@ if __name__ == "__main__":
     input_file = sys.argv[1]
     output_file = sys.argv[2]
     
-    segment_speeches(input_file, output_file)
\ No newline at end of file
+    segment_speeches(input_file, output_file)
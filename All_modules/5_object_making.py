@@ -4,15 +4,42 @@
 
 # ✅ Usage:
 # python 5_object_making.py "input.json" "output.json"
+# python 5_object_making.py "input.jsonl" "output.jsonl"     (JSON Lines, streamed)
+# python 4_speaker_wise.py "input.txt" - | python 5_object_making.py - "output.jsonl"
+# python 5_object_making.py "OCR_Outputs/4_speeches_list" "OCR_Outputs/5_speech_objects" --dir --workers 8
 
 import sys
 import os
 import re
 import unicodedata
 import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from jsonl_io import is_jsonl, iter_jsonl, write_jsonl
+
+STAGE_VERSION = 1  # bump when the speech objects change (see pipeline.stage_versions)
 
 DEV = r"\u0900-\u097F"
 
+# Procedural noise removed from every speech body (clean_speech_text)
+PROCEDURAL_PATTERNS = [
+    r"honou?rable\s+speaker", r"madam\s+speaker", r"mr\.?\s+deputy\s+chairman",
+    r"mr\.?\s+chairman", r"\(applause\)", r"\(laughter\)", r"thank\s+you", r"\(order\)",
+    r"hear\s+hear", r"\(expunged\)", r"\(interruptions\)", r"\(व्यवधान\)"
+]
+
+# Speaker heads without a colon (extract_speaker_clean_v2, strategy 2)
+SPEAKER_PATTERNS = [
+    # Hindi titles
+    rf"^(श्री|सुश्री|श्रीमती|डॉ\.?|कुमारी)\s+([{DEV}\s]+?)(?=\s*:|\s*$)",
+    # English titles with names (including ALL CAPS)
+    r"^(MR\.|MS\.|MRS\.|DR\.|PROF\.|SHRI|SHRIMATI|SMT\.|KUMARI)\s+([A-Z][A-Za-z\s\.]+?)(?=\s*:|\s*$)",
+    # Just names in caps (like "SHRIMATI JAYA BACHCHAN")
+    r"^([A-Z][A-Z\s\.]+?)(?=\s*:|\s*$)",
+]
+
 
 def fix_hindi_spacing_v2(text):
     """
@@ -84,17 +111,7 @@ def extract_speaker_clean_v2(text):
     
     # STRATEGY 2: If no colon, try pattern matching
     else:
-        # Enhanced speaker regex covering more cases
-        speaker_patterns = [
-            # Hindi titles
-            rf"^(श्री|सुश्री|श्रीमती|डॉ\.?|कुमारी)\s+([{DEV}\s]+?)(?=\s*:|\s*$)",
-            # English titles with names (including ALL CAPS)
-            r"^(MR\.|MS\.|MRS\.|DR\.|PROF\.|SHRI|SHRIMATI|SMT\.|KUMARI)\s+([A-Z][A-Za-z\s\.]+?)(?=\s*:|\s*$)",
-            # Just names in caps (like "SHRIMATI JAYA BACHCHAN")
-            r"^([A-Z][A-Z\s\.]+?)(?=\s*:|\s*$)",
-        ]
-        
-        for pattern in speaker_patterns:
+        for pattern in SPEAKER_PATTERNS:
             match = re.match(pattern, text, flags=re.IGNORECASE)
             if match:
                 speaker = match.group(0).strip()
@@ -103,17 +120,18 @@ def extract_speaker_clean_v2(text):
                 speech_text = re.sub(r"^:\s*", "", speech_text)
                 break
 
-    # --- Clean the speech text ---
+    return {"speaker": speaker, "speech": clean_speech_text(speech_text)}
+
+
+def clean_speech_text(speech_text):
+    """
+    Strip procedural noise and non-letter symbols from a speech body.
+    """
     # Remove ellipses or long dot chains
     speech_text = re.sub(r"\.{2,}", " ", speech_text)
 
     # Remove procedural noise
-    procedural_patterns = [
-        r"honou?rable\s+speaker", r"madam\s+speaker", r"mr\.?\s+deputy\s+chairman",
-        r"mr\.?\s+chairman", r"\(applause\)", r"\(laughter\)", r"thank\s+you", r"\(order\)",
-        r"hear\s+hear", r"\(expunged\)", r"\(interruptions\)", r"\(व्यवधान\)"
-    ]
-    for p in procedural_patterns:
+    for p in PROCEDURAL_PATTERNS:
         speech_text = re.sub(p, " ", speech_text, flags=re.IGNORECASE)
 
     # Keep only Hindi/English letters + punctuation
@@ -125,61 +143,291 @@ def extract_speaker_clean_v2(text):
     # Normalize spaces
     speech_text = re.sub(r"\s+", " ", speech_text).strip()
 
-    return {"speaker": speaker, "speech": speech_text}
+    return speech_text
+
+
+def _normalize(text):
+    return unicodedata.normalize("NFKC", text.replace("|", "I")).strip()
+
+
+# ----------------------------------------------------------
+# Batch API: same results as extract_speaker_clean_v2 / clean_speech_text
+# (kept above as the reference), with every pattern compiled once and the
+# speech bodies of a whole batch cleaned together: each pass runs once over
+# the batch joined by BATCH_SEP, which no pattern can match across.
+# ----------------------------------------------------------
+BATCH_SIZE = 256
+BATCH_SEP = "\x00"
+
+# applied one after the other, as in clean_speech_text: removing one can create a
+# match for a later one ("hear (applause) hear"), so they are not merged into one regex
+RE_PROCEDURAL = [re.compile(p, re.IGNORECASE) for p in PROCEDURAL_PATTERNS]
+
+RE_DOT_RUN = re.compile(r"\.{2,}")
+RE_LEADING_DOTS = re.compile(r"^\.+")
+RE_LEADING_COLON = re.compile(r"^:\s*")
+RE_CAPS_WORD = re.compile(r"[A-Z]{2,}")
+RE_DEV_CHAR = re.compile(rf"[{DEV}]")
+# single-pass character filter (BATCH_SEP survives it)
+RE_NOT_KEPT = re.compile(rf"[^A-Za-z{DEV}\s.,?!।{BATCH_SEP}]")
+# whitespace between two one-letter Devanagari tokens (OCR split words): dropping it
+# rejoins the letters in one linear pass; BATCH_SEP counts as a token edge
+RE_SPLIT_LETTER_GAP = re.compile(
+    rf"(?<![^\s{BATCH_SEP}])([{DEV}])\s+(?=[{DEV}](?![^\s{BATCH_SEP}]))")
+RE_DEV_THEN_LATIN = re.compile(rf"([{DEV}])([A-Za-z0-9])")
+RE_LATIN_THEN_DEV = re.compile(rf"([A-Za-z0-9])([{DEV}])")
+RE_SPACE_BEFORE_PUNCT = re.compile(r"\s+([.,।?!])")
+RE_PUNCT_THEN_CHAR = re.compile(r"([।?!,\.])([^\s])")
+RE_SPACES = re.compile(r"\s+")
+RE_SPEAKER_PATTERNS = [re.compile(p, re.IGNORECASE) for p in SPEAKER_PATTERNS]
+
+
+def split_speaker(text):
+    """
+    Speaker detection of extract_speaker_clean_v2 on its own:
+    returns (speaker, uncleaned speech text).
+    """
+    text = RE_LEADING_DOTS.sub("", _normalize(text))
+
+    if ":" in text:
+        potential_speaker, _, rest = text.partition(":")
+        potential_speaker = potential_speaker.strip()
+        if len(potential_speaker) < 100 and (
+            RE_CAPS_WORD.search(potential_speaker) or RE_DEV_CHAR.search(potential_speaker)
+        ):
+            return potential_speaker, rest.strip()
+        return "Unknown", text
+
+    for pattern in RE_SPEAKER_PATTERNS:
+        match = pattern.match(text)
+        if match:
+            speaker = match.group(0).strip()
+            return speaker, RE_LEADING_COLON.sub("", text[len(speaker):].strip())
+    return "Unknown", text
+
+
+def clean_speech_texts(bodies):
+    """
+    clean_speech_text over a list of speech bodies, as a fixed number of passes
+    over the whole batch instead of ~20 regex calls and a token loop per speech.
+    """
+    if any(BATCH_SEP in body for body in bodies):
+        return [clean_speech_text(body) for body in bodies]
+
+    text = RE_DOT_RUN.sub(" ", BATCH_SEP.join(bodies))
+    for pattern in RE_PROCEDURAL:
+        text = pattern.sub(" ", text)
+    text = RE_NOT_KEPT.sub(" ", text)
+
+    # fix_hindi_spacing_v2 (its "\.{2,}" pass has nothing left to do here)
+    text = RE_SPLIT_LETTER_GAP.sub(r"\1", text)
+    text = RE_DEV_THEN_LATIN.sub(r"\1 \2", text)
+    text = RE_LATIN_THEN_DEV.sub(r"\1 \2", text)
+    text = RE_SPACE_BEFORE_PUNCT.sub(r"\1", text)
+    text = RE_PUNCT_THEN_CHAR.sub(r"\1 \2", text)
+    text = RE_SPACES.sub(" ", text)
+    return [body.strip() for body in text.split(BATCH_SEP)]
+
+
+def extract_speakers_batch(texts):
+    """
+    Batch version of extract_speaker_clean_v2: one {"speaker", "speech"} per text.
+    """
+    pairs = [split_speaker(text) for text in texts]
+    speeches = clean_speech_texts([body for _, body in pairs])
+    return [{"speaker": speaker, "speech": speech} for (speaker, _), speech in zip(pairs, speeches)]
+
+
+def speech_object_from_segment(segment):
+    """
+    Build a speech object from a 4_speaker_wise segment dict. The speaker found by
+    stage 4 is reused as is; only segments without one go through split_speaker.
+    """
+    speaker, body = _segment_speaker(segment)
+    return {"speaker": speaker, "speech": clean_speech_texts([body])[0]}
+
+
+def _segment_speaker(segment):
+    if segment["speaker"] is None:
+        return split_speaker(segment["text"])
+    return _normalize(segment["speaker"]), _normalize(segment["text"][segment["speech_start"]:])
+
+
+def iter_speech_objects(speeches, batch_size=BATCH_SIZE):
+    """
+    Generator version of make_speech_objects: speeches are read batch_size at a
+    time and cleaned together, so speeches can come straight from a stream.
+    """
+    batch = []
+    for s in speeches:
+        is_segment = isinstance(s, dict)
+        if len(s["text"] if is_segment else s.strip()) > 10:
+            batch.append(_segment_speaker(s) if is_segment else split_speaker(s))
+        if len(batch) >= batch_size:
+            yield from _clean_batch(batch)
+            batch = []
+    if batch:
+        yield from _clean_batch(batch)
+
+
+def _clean_batch(pairs):
+    speeches = clean_speech_texts([body for _, body in pairs])
+    for (speaker, _), speech in zip(pairs, speeches):
+        # Only add if we got meaningful content
+        if speech:
+            yield {"speaker": speaker, "speech": speech}
+
+
+def make_speech_objects(speeches):
+    """
+    Turn speeches into {"speaker", "speech"} objects, skipping fragments that
+    are too short or end up empty after cleaning. Accepts raw speech strings or
+    the segment dicts of 4_speaker_wise.iter_speech_segments.
+    """
+    return list(iter_speech_objects(speeches))
+
+
+def _print_sample(speech_objects, log, limit=8):
+    print("\n" + "="*70, file=log)
+    print("📝 SAMPLE OUTPUT:", file=log)
+    print("="*70, file=log)
+    for i, obj in enumerate(speech_objects, 1):
+        if i <= limit:
+            print(f"\n{i}. 🎙️ Speaker: {obj['speaker']}", file=log)
+            print(f"   🗣️ Speech: {obj['speech'][:200]}...", file=log)
+            print("-" * 70, file=log)
+        yield obj
 
 
 def process_speeches(input_path, output_path):
+    use_stdin = input_path == "-"
+    use_stdout = output_path == "-"
+    # status messages must not end up inside the JSON Lines when they go to stdout
+    log = sys.stderr if use_stdout else sys.stdout
     try:
         # Check input file
-        if not os.path.exists(input_path):
-            print(f"❌ Error: Input file not found: {input_path}")
+        if not use_stdin and not os.path.exists(input_path):
+            print(f"❌ Error: Input file not found: {input_path}", file=log)
             return
         
-        print(f"🔄 Reading speeches from: {input_path}")
-        with open(input_path, "r", encoding="utf-8") as f:
-            speeches = json.load(f)
-        
-        print(f"✅ Loaded {len(speeches)} speeches.")
+        print(f"🔄 Reading speeches from: {'stdin' if use_stdin else input_path}", file=log)
+        if is_jsonl(input_path):
+            # JSON Lines: speeches are read one by one while objects are written
+            speeches = iter_jsonl(input_path)
+        else:
+            with open(input_path, "r", encoding="utf-8") as f:
+                speeches = json.load(f)
+            print(f"✅ Loaded {len(speeches)} speeches.", file=log)
         
         # --- Apply to all speeches ---
-        print("🔍 Extracting speaker information and cleaning speeches...")
-        speech_objects = []
-        for s in speeches:
-            if len(s.strip()) > 10:
-                obj = extract_speaker_clean_v2(s)
-                # Only add if we got meaningful content
-                if obj["speech"]:
-                    speech_objects.append(obj)
-
-        print(f"✅ Extracted {len(speech_objects)} speech objects.")
-        print("\n" + "="*70)
-        print("📝 SAMPLE OUTPUT:")
-        print("="*70)
-
-        for i, obj in enumerate(speech_objects[:8], 1):
-            print(f"\n{i}. 🎙️ Speaker: {obj['speaker']}")
-            print(f"   🗣️ Speech: {obj['speech'][:200]}...")
-            print("-" * 70)
-
-        # Save to file
-        print(f"\n💾 Saving speech objects to: {output_path}")
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(speech_objects, f, ensure_ascii=False, indent=4)
+        print("🔍 Extracting speaker information and cleaning speeches...", file=log)
+        speech_objects = _print_sample(iter_speech_objects(speeches), log)
 
-        print(f"✅ Done! Speech objects saved to:\n{output_path}")
+        if is_jsonl(output_path):
+            count = write_jsonl(output_path, speech_objects)
+        else:
+            speech_objects = list(speech_objects)
+            count = len(speech_objects)
+
+            # Save to file
+            print(f"\n💾 Saving speech objects to: {output_path}")
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(speech_objects, f, ensure_ascii=False, indent=4)
+
+        print(f"\n✅ Extracted {count} speech objects.", file=log)
+        print(f"✅ Done! Speech objects saved to:\n{'stdout' if use_stdout else output_path}", file=log)
 
     except json.JSONDecodeError as e:
-        print(f"❌ Error: Invalid JSON in input file: {e}")
+        print(f"❌ Error: Invalid JSON in input file: {e}", file=log)
     except Exception as e:
-        print(f"❌ Error during speech processing: {e}")
+        print(f"❌ Error during speech processing: {e}", file=log)
+
+
+def _final_name(input_name, jsonl=False):
+    # follow the orchestrators' naming: <base>_speeches.json(l) → <base>_final.json(l)
+    ext = ".jsonl" if jsonl else ".json"
+    for suffix in ("_speeches.jsonl", "_speeches.json"):
+        if input_name.endswith(suffix):
+            return input_name[:-len(suffix)] + "_final" + ext
+    return os.path.splitext(input_name)[0] + "_final" + ext
+
+
+def _objects_one_file(input_path, output_path):
+    """
+    Stage 5 on one file inside a pool worker: returns (speech objects written, seconds).
+    """
+    started = time.time()
+    if is_jsonl(input_path):
+        speeches = iter_jsonl(input_path)
+    else:
+        with open(input_path, "r", encoding="utf-8") as f:
+            speeches = json.load(f)
+
+    if is_jsonl(output_path):
+        count = write_jsonl(output_path, iter_speech_objects(speeches))
+    else:
+        speech_objects = make_speech_objects(speeches)
+        count = len(speech_objects)
+        tmp_path = output_path + ".part"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(speech_objects, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, output_path)
+    return count, time.time() - started
+
+
+def process_directory(input_dir, output_dir, workers=os.cpu_count(), jsonl=False):
+    """
+    Run stage 5 on every *_speeches.json / *_speeches.jsonl of input_dir
+    (e.g. OCR_Outputs/4_speeches_list) into output_dir, one file per worker
+    process, biggest files first. Prints each file's status and time as it
+    finishes; a failing file is reported and skipped.
+    Returns {file name: {"ok", "speech_objects" or "error", "seconds"}}.
+    """
+    files = sorted(
+        (name for name in os.listdir(input_dir) if name.endswith(("_speeches.json", "_speeches.jsonl"))),
+        key=lambda name: os.path.getsize(os.path.join(input_dir, name)),
+        reverse=True
+    )
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"⚡ Making speech objects for {len(files)} files from {input_dir} on {workers} workers...")
+
+    started = time.time()
+    status = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_objects_one_file, os.path.join(input_dir, name),
+                        os.path.join(output_dir, _final_name(name, jsonl))): name
+            for name in files
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                count, seconds = future.result()
+                status[name] = {"ok": True, "speech_objects": count, "seconds": round(seconds, 3)}
+                print(f"✅ {name}: {count} speech objects in {seconds:.1f}s")
+            except Exception as e:
+                status[name] = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                print(f"❌ Error processing {name}: {e}")
+
+    failed = sum(1 for s in status.values() if not s["ok"])
+    print(f"✅ Done! {len(files) - failed}/{len(files)} files in {time.time() - started:.1f}s, saved to:\n{output_dir}")
+    return status
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("⚠️ Usage: python 5_object_making.py <input_json_path> <output_json_path>")
-        sys.exit(1)
-    
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
-    
-    process_speeches(input_file, output_file)
+    parser = argparse.ArgumentParser(description="Turn segmented speeches into speaker/speech objects.")
+    parser.add_argument("input", help="speeches .json/.jsonl file, '-' for stdin, or a folder with --dir")
+    parser.add_argument("output", help="speech objects .json/.jsonl file, '-' for stdout, or a folder with --dir")
+    parser.add_argument("--dir", action="store_true",
+                        help="process every *_speeches.json(l) of the input folder into the output folder")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="files processed at the same time with --dir (default: all cores)")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="with --dir, write *_final.jsonl instead of *_final.json")
+    args = parser.parse_args()
+
+    if args.dir:
+        status = process_directory(args.input, args.output, workers=args.workers, jsonl=args.jsonl)
+        sys.exit(1 if any(not s["ok"] for s in status.values()) else 0)
+
+    process_speeches(args.input, args.output)
@@ -1,15 +1,63 @@
 import os
+import sys
 import json
 import re
+import shutil
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from ocr_cache import file_sha256
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset  # noqa: F401  (pa.dataset.partitioning)
+    import pyarrow.parquet as pq
+except ImportError:  # only needed for --format parquet
+    pa = pq = None
+
+# ✅ Usage:
+# python 6-cleaned_speeches.py
+# python 6-cleaned_speeches.py "OCR_Outputs/5_speech_objects" "compiled_speeches.csv" --workers 8
+# python 6-cleaned_speeches.py "OCR_Outputs/5_speech_objects" "compiled_speeches_parquet" --format parquet
+# python 6-cleaned_speeches.py "OCR_Outputs/5_speech_objects" "compiled_speeches_parquet" --format parquet --incremental
+#
+# Loading the Parquet corpus (only the columns asked for are read, memory-mapped):
+#   df = pd.read_parquet("compiled_speeches_parquet", columns=["speaker", "date"])
+#   df = load_corpus("compiled_speeches_parquet", columns=["speaker", "date"], filters=[("date", ">=", "2009-01-01")])
+
+# --- Input/Output Paths ---
+input_dir = r"C:\Users\asus\OneDrive\Desktop\NLP\MiniProject\OCR_Outputs\5_speech_objects"
+output_file = "compiled_speeches.csv"
+output_dataset = "compiled_speeches_parquet"
+
+COLUMNS = ["date", "time", "speaker", "speech"]
+# Parquet layout: <dataset>/date=YYYY-MM-DD/session=N/<source file stem>.parquet,
+# holding time, speaker (dictionary-encoded) and speech; date/session live in the path
+PARTITION_COLUMNS = ["date", "session"]
+RE_FILENAME_SESSION = re.compile(r"_session_(\d+)")
+# per source file: size, mtime, sha256, part path and rows (pyarrow skips "_" files)
+MANIFEST_NAME = "_manifest.json"
+
+UNWANTED_SPEAKERS = {
+    "mr. chairman", "chairman", "unknown",
+    "mr. deputy chairman", "shri up-sabhapati",
+    "श्री उपसभापति", "अध्यक्ष", "सभापति"
+}
+# one compiled search instead of a substring test per unwanted speaker
+RE_UNWANTED_SPEAKER = re.compile("|".join(re.escape(sp) for sp in sorted(UNWANTED_SPEAKERS, key=len, reverse=True)))
+RE_FILENAME_DATE_TIME = re.compile(r'(\d{4}-\d{2}-\d{2})-(\d{1,2}\.\d{2}\s?(?:am|pm|AM|PM))')
+
+
 def extract_date_time(filename):
     """
     Extract date and time from filenames like:
     2008-02-25-11.00amTo12.00Noon_session_213_final.json
     """
     # Match pattern like 2008-02-25-11.00amTo12.00Noon
-    match = re.search(r'(\d{4}-\d{2}-\d{2})-(\d{1,2}\.\d{2}\s?(?:am|pm|AM|PM))', filename)
+    match = RE_FILENAME_DATE_TIME.search(filename)
     if match:
         date = match.group(1)
         time = match.group(2).replace(".", ":").upper().replace(" ", "")
@@ -18,60 +66,310 @@ def extract_date_time(filename):
         return None, None
 
 
-def collect_jsons(root_dir):
+def list_speech_files(root_dir):
+    """
+    Every *.json under root_dir whose name carries a date/time, in os.walk order.
+    """
+    files = []
+    for dirpath, _, filenames in os.walk(root_dir):
+        for fname in filenames:
+            if fname.endswith(".json") and extract_date_time(fname)[0]:
+                files.append(os.path.join(dirpath, fname))
+    return files
+
+
+def read_speech_file(fpath):
+    """
+    Load one speech-objects JSON into a columnar batch {column: list of values},
+    skipping empty speeches and unwanted speakers.
+    Returns (batch, None), or (None, error message) if the file cannot be read.
+    """
+    date, time = extract_date_time(os.path.basename(fpath))
+    batch = {column: [] for column in COLUMNS}
+    try:
+        with open(fpath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        for entry in data:
+            speaker = str(entry.get("speaker", "")).strip()
+            speech = str(entry.get("speech", "")).strip()
+
+            # skip empty or unwanted speakers
+            if not speech:
+                continue
+            if RE_UNWANTED_SPEAKER.search(speaker.lower()):
+                continue
+
+            batch["speaker"].append(speaker)
+            batch["speech"].append(speech)
+    except Exception as e:
+        return None, str(e)
+
+    batch["date"] = [date] * len(batch["speech"])
+    batch["time"] = [time] * len(batch["speech"])
+    return batch, None
+
+
+def _batch_frame(fpath, result):
+    batch, error = result
+    if error is not None:
+        print(f"❌ Error in {fpath}: {error}")
+        return None
+    return pd.DataFrame(batch, columns=COLUMNS)
+
+
+def iter_speech_batches(root_dir, workers=1):
+    """
+    Yield one DataFrame per speech file, in os.walk order. Files are read and
+    filtered on `workers` processes; at most 2 x workers files are in flight, so
+    memory stays bounded even when the consumer (CSV writing) is slower than the workers.
+    """
+    files = list_speech_files(root_dir)
+    if workers <= 1:
+        for fpath in files:
+            df = _batch_frame(fpath, read_speech_file(fpath))
+            if df is not None:
+                yield df
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        try:
+            for fpath in files:
+                in_flight.append((fpath, pool.submit(read_speech_file, fpath)))
+                if len(in_flight) >= 2 * workers:
+                    done_path, future = in_flight.popleft()
+                    df = _batch_frame(done_path, future.result())
+                    if df is not None:
+                        yield df
+            while in_flight:
+                done_path, future = in_flight.popleft()
+                df = _batch_frame(done_path, future.result())
+                if df is not None:
+                    yield df
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+
+def collect_jsons(root_dir, workers=1):
     """
     Recursively collect all JSONs, attach date/time from filenames,
     and skip unwanted speakers.
     """
-    unwanted_speakers = {
-        "mr. chairman", "chairman", "unknown",
-        "mr. deputy chairman", "shri up-sabhapati",
-        "श्री उपसभापति", "अध्यक्ष", "सभापति"
-    }
+    batches = list(iter_speech_batches(root_dir, workers))
+    if not batches:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(batches, ignore_index=True)
 
-    all_records = []
 
-    # Walk through all directories
-    for dirpath, _, filenames in os.walk(root_dir):
-        for fname in filenames:
-            if fname.endswith(".json"):
-                fpath = os.path.join(dirpath, fname)
-                date, time = extract_date_time(fname)
-                if not date:
-                    continue  # skip files without valid date/time
-
-                try:
-                    with open(fpath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-
-                    for entry in data:
-                        speaker = str(entry.get("speaker", "")).strip()
-                        speech = str(entry.get("speech", "")).strip()
-
-                        # skip empty or unwanted speakers
-                        if not speech:
-                            continue
-                        if any(sp in speaker.lower() for sp in unwanted_speakers):
-                            continue
-
-                        all_records.append({
-                            "date": date,
-                            "time": time,
-                            "speaker": speaker,
-                            "speech": speech
-                        })
-                except Exception as e:
-                    print(f"❌ Error in {fpath}: {e}")
-
-    df = pd.DataFrame(all_records)
-    return df
+def compile_csv(root_dir, output_file, workers=1):
+    """
+    Stream every file's batch straight into the CSV (header once), so memory
+    holds a few files' speeches at a time. Returns the number of rows written.
+    """
+    rows = 0
+    tmp_path = output_file + ".part"
+    with open(tmp_path, "w", encoding="utf-8-sig", newline="") as f:
+        pd.DataFrame(columns=COLUMNS).to_csv(f, index=False)
+        for df in iter_speech_batches(root_dir, workers):
+            df.to_csv(f, index=False, header=False)
+            rows += len(df)
+    os.replace(tmp_path, output_file)
+    return rows
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow")
+
+
+def partition_path(dataset_dir, fpath):
+    """
+    Where the Parquet part of one speech-objects file goes.
+    """
+    fname = os.path.basename(fpath)
+    date, _ = extract_date_time(fname)
+    session = RE_FILENAME_SESSION.search(fname)
+    return os.path.join(dataset_dir, f"date={date}", f"session={session.group(1) if session else 'unknown'}",
+                        os.path.splitext(fname)[0] + ".parquet")
+
+
+def write_speech_partition(fpath, dataset_dir):
+    """
+    Read one speech file and write its Parquet part (in a pool worker).
+    Returns (rows written, None), or (0, error message) if the file cannot be read.
+    """
+    batch, error = read_speech_file(fpath)
+    if error is not None:
+        return 0, error
+
+    table = pa.table({
+        "time": pa.array(batch["time"], pa.string()).dictionary_encode(),
+        "speaker": pa.array(batch["speaker"], pa.string()).dictionary_encode(),
+        "speech": pa.array(batch["speech"], pa.string()),
+    })
+    out_path = partition_path(dataset_dir, fpath)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp_path = out_path + ".part"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, out_path)
+    return len(table), None
+
+
+def compile_parquet(root_dir, dataset_dir, workers=1):
+    """
+    Write the corpus as a Parquet dataset partitioned by date/session, one part
+    per source file, each written by the worker that read it. The dataset is
+    built next to dataset_dir and swapped in at the end.
+    Returns the number of rows written.
+    """
+    _require_pyarrow()
+    files = list_speech_files(root_dir)
+    tmp_dir = dataset_dir.rstrip("/\\") + ".part"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+
+    rows = 0
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(write_speech_partition, files, [tmp_dir] * len(files), chunksize=8))
+    else:
+        results = [write_speech_partition(fpath, tmp_dir) for fpath in files]
+    for fpath, (count, error) in zip(files, results):
+        if error is not None:
+            print(f"❌ Error in {fpath}: {error}")
+        rows += count
+
+    os.makedirs(tmp_dir, exist_ok=True)
+    if os.path.exists(dataset_dir):
+        shutil.rmtree(dataset_dir)
+    os.replace(tmp_dir, dataset_dir)
+    return rows
+
+
+def _load_manifest(dataset_dir):
+    manifest_path = os.path.join(dataset_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(dataset_dir, manifest):
+    manifest_path = os.path.join(dataset_dir, MANIFEST_NAME)
+    tmp_path = manifest_path + ".part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, manifest_path)
+
+
+def compile_parquet_incremental(root_dir, dataset_dir, workers=1):
+    """
+    Bring the Parquet dataset up to date with root_dir, touching only the parts
+    whose source file is new, changed or gone. A source is unchanged if its size
+    and mtime match the manifest; if only the mtime moved, its sha256 decides.
+    Returns counts of added/replaced/removed/unchanged/failed files.
+    """
+    _require_pyarrow()
+    os.makedirs(dataset_dir, exist_ok=True)
+    manifest = _load_manifest(dataset_dir)
+    summary = {"added": 0, "replaced": 0, "removed": 0, "unchanged": 0, "failed": 0}
+
+    to_write = []
+    seen = set()
+    for fpath in list_speech_files(root_dir):
+        key = os.path.relpath(fpath, root_dir)
+        seen.add(key)
+        stat = os.stat(fpath)
+        entry = manifest.get(key)
+        if entry and entry["size"] == stat.st_size:
+            if entry["mtime"] == stat.st_mtime:
+                summary["unchanged"] += 1
+                continue
+            file_hash = file_sha256(fpath)
+            if entry["sha256"] == file_hash:
+                entry["mtime"] = stat.st_mtime  # touched, not changed
+                summary["unchanged"] += 1
+                continue
+        else:
+            file_hash = file_sha256(fpath)
+        to_write.append((fpath, key, stat, file_hash))
+
+    # sources that disappeared take their part with them
+    for key in [key for key in manifest if key not in seen]:
+        part = os.path.join(dataset_dir, manifest.pop(key)["part"])
+        if os.path.exists(part):
+            os.remove(part)
+        summary["removed"] += 1
+
+    paths = [fpath for fpath, _, _, _ in to_write]
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(write_speech_partition, paths, [dataset_dir] * len(paths), chunksize=8))
+    else:
+        results = [write_speech_partition(fpath, dataset_dir) for fpath in paths]
+
+    for (fpath, key, stat, file_hash), (rows, error) in zip(to_write, results):
+        part = os.path.relpath(partition_path(dataset_dir, fpath), dataset_dir)
+        if error is not None:
+            print(f"❌ Error in {fpath}: {error}")
+            summary["failed"] += 1
+            # an unreadable source must not leave its old rows behind; retried next run
+            if key in manifest:
+                manifest.pop(key)
+                if os.path.exists(os.path.join(dataset_dir, part)):
+                    os.remove(os.path.join(dataset_dir, part))
+            continue
+        summary["replaced" if key in manifest else "added"] += 1
+        manifest[key] = {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": file_hash,
+                         "part": part, "rows": rows}
+
+    _save_manifest(dataset_dir, manifest)
+    return summary
+
+
+def load_corpus(dataset_dir, columns=None, filters=None):
+    """
+    Load the Parquet corpus into a DataFrame, reading only `columns`
+    (e.g. ["speaker", "date"] never touches the speech text) and only the
+    partitions/rows matching `filters` (pyarrow filter tuples). Files are memory-mapped.
+    """
+    _require_pyarrow()
+    partitioning = pa.dataset.partitioning(
+        pa.schema([("date", pa.string()), ("session", pa.string())]), flavor="hive")
+    table = pq.read_table(dataset_dir, columns=columns, filters=filters,
+                          partitioning=partitioning, memory_map=True)
+    return table.to_pandas()
 
 
 if __name__ == "__main__":
-    input_dir = r"C:\Users\asus\OneDrive\Desktop\NLP\MiniProject\OCR_Outputs\5_speech_objects"
-    df = collect_jsons(input_dir)
-    print(f"\n✅ Total valid speeches collected: {len(df)}")
+    parser = argparse.ArgumentParser(description="Compile every speech-objects JSON into one table.")
+    parser.add_argument("input_dir", nargs="?", default=input_dir, help="5_speech_objects folder")
+    parser.add_argument("output", nargs="?",
+                        help=f"compiled CSV, or Parquet dataset folder with --format parquet "
+                             f"(default: {output_file} / {output_dataset})")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="files read at the same time (default: all cores)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="with --format parquet: only (re)write parts whose source file changed")
+    args = parser.parse_args()
+    if args.incremental and args.format != "parquet":
+        parser.error("--incremental needs --format parquet (a CSV cannot replace single partitions)")
 
-    output_file = "compiled_speeches.csv"
-    df.to_csv(output_file, index=False, encoding='utf-8-sig')
-    print(f"📁 Saved compiled data to {output_file}")
+    if args.incremental:
+        output = args.output or output_dataset
+        summary = compile_parquet_incremental(args.input_dir, output, workers=args.workers)
+        print(f"\n✅ {summary['added']} added, {summary['replaced']} replaced, {summary['removed']} removed, "
+              f"{summary['unchanged']} unchanged, {summary['failed']} failed.")
+        print(f"📁 Updated compiled data in {output}")
+        sys.exit(1 if summary["failed"] else 0)
+
+    if args.format == "parquet":
+        output = args.output or output_dataset
+        total = compile_parquet(args.input_dir, output, workers=args.workers)
+    else:
+        output = args.output or output_file
+        total = compile_csv(args.input_dir, output, workers=args.workers)
+    print(f"\n✅ Total valid speeches collected: {total}")
+    print(f"📁 Saved compiled data to {output}")
@@ -0,0 +1,267 @@
+# ann_index.py
+# Persistent approximate nearest-neighbour (IVF) index for "find similar speeches".
+# - The normalized speech vectors are split into nlist clusters (inverted lists)
+#   by k-means; a query only scans the nprobe lists whose centroids are closest,
+#   instead of every speech in the corpus.
+# - Vectors are not copied: the index keeps the embedding-store row of each speech
+#   (see embedding_store.py) plus its date, time and speaker.
+# - New sessions are added with `add`: their speeches go to the nearest existing
+#   list. Rebuild (`build`) once the corpus has grown a lot, to retrain the lists.
+
+# ✅ Usage:
+# python ann_index.py build "compiled_speeches_parquet" "embeddings" "speech_index"
+# python ann_index.py add "compiled_speeches_parquet" "speech_index"
+# python ann_index.py query "speech_index" --text "किसानों की आय" --k 10
+# python ann_index.py query "speech_index" --id 42
+#
+# From the notebook:
+#   index = load_index("speech_index")
+#   query_text(index, "farmers income", k=10)   # [{"id", "score", "speaker", "date", "time", "preview"}, ...]
+#   query_id(index, 42)
+
+import os
+import json
+import time
+import argparse
+import importlib
+import numpy as np
+
+from jsonl_io import iter_jsonl, write_jsonl
+from embedding_store import (DEFAULT_MODEL, text_key, load_meta, load_vectors, embed_texts,
+                             _sentence_transformer_encoder)
+from similarity import normalize_rows
+
+CENTROIDS_NAME = "centroids.npy"
+RECORDS_NAME = "records.jsonl"
+META_NAME = "meta.json"
+
+DEFAULT_NPROBE = 8
+PREVIEW_CHARS = 200
+ASSIGN_BLOCK = 8192
+
+
+def default_nlist(n):
+    """
+    About 4 * sqrt(N) lists, so a query with nprobe=8 scans ~2 * sqrt(N) speeches.
+    """
+    return max(1, min(n, int(4 * np.sqrt(n))))
+
+
+def speech_key(row):
+    """
+    Identity of one corpus row, used to skip speeches already in the index.
+    """
+    return text_key("\x1f".join(str(row[c]) for c in ("date", "time", "speaker", "speech")))
+
+
+def read_corpus(path):
+    """
+    date/time/speaker/speech of a compiled corpus (CSV file or Parquet dataset).
+    """
+    import pandas as pd
+    if os.path.isdir(path):
+        cleaned_speeches = importlib.import_module("6-cleaned_speeches")
+        df = cleaned_speeches.load_corpus(path, columns=["date", "time", "speaker", "speech"])
+    else:
+        df = pd.read_csv(path, usecols=["date", "time", "speaker", "speech"], keep_default_na=False)
+    return df.astype(str)
+
+
+def _save_meta(index_dir, meta):
+    meta_path = os.path.join(index_dir, META_NAME)
+    tmp_path = meta_path + ".part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, meta_path)
+
+
+def _assign(vectors, centroids):
+    """
+    Nearest centroid (by cosine) of every normalized vector, a block at a time.
+    """
+    lists = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), ASSIGN_BLOCK):
+        lists[start:start + ASSIGN_BLOCK] = np.argmax(vectors[start:start + ASSIGN_BLOCK] @ centroids.T, axis=1)
+    return lists
+
+
+def _new_records(df, store_dir, known_keys=()):
+    """
+    Embed the corpus rows not in known_keys; returns (records, normalized vectors).
+    """
+    known_keys = set(known_keys)
+    records, texts = [], []
+    for row in df.to_dict("records"):
+        key = speech_key(row)
+        if key in known_keys:
+            continue
+        known_keys.add(key)
+        records.append({"key": key, "date": row["date"], "time": row["time"],
+                        "speaker": row["speaker"], "preview": row["speech"][:PREVIEW_CHARS]})
+        texts.append(row["speech"])
+
+    if not texts:
+        return [], None
+    model_name = (load_meta(store_dir) or {}).get("model", DEFAULT_MODEL)
+    vectors = normalize_rows(embed_texts(texts, store_dir, model_name=model_name))
+    row_of = {key: i for i, key in enumerate(load_meta(store_dir)["keys"])}
+    for record, text in zip(records, texts):
+        record["row"] = row_of[text_key(text)]
+    return records, vectors
+
+
+def build_index(corpus, store_dir, index_dir, nlist=None):
+    """
+    Embed the whole corpus (new speeches only are encoded), train nlist k-means
+    centroids and write a fresh index to index_dir. Returns the number of speeches.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+
+    records, vectors = _new_records(read_corpus(corpus), store_dir)
+    if not records:
+        raise ValueError(f"No speeches in {corpus}")
+    nlist = nlist or default_nlist(len(records))
+    print(f"🧭 Training {nlist} lists on {len(records)} speeches...")
+    kmeans = MiniBatchKMeans(n_clusters=nlist, batch_size=4096, n_init=3, random_state=0)
+    kmeans.fit(vectors)
+    centroids = normalize_rows(kmeans.cluster_centers_)
+
+    for record, list_id in zip(records, _assign(vectors, centroids)):
+        record["list"] = int(list_id)
+
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, CENTROIDS_NAME), centroids)
+    write_jsonl(os.path.join(index_dir, RECORDS_NAME), records)
+    _save_meta(index_dir, {"store_dir": os.path.abspath(store_dir), "nlist": nlist, "count": len(records)})
+    return len(records)
+
+
+def add_to_index(corpus, index_dir):
+    """
+    Add the corpus speeches that are not in the index yet (e.g. newly compiled
+    sessions) to their nearest list. Returns the number of speeches added.
+    """
+    with open(os.path.join(index_dir, META_NAME), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    records = list(iter_jsonl(os.path.join(index_dir, RECORDS_NAME)))
+    new_records, vectors = _new_records(read_corpus(corpus), meta["store_dir"],
+                                        (record["key"] for record in records))
+    if not new_records:
+        return 0
+
+    centroids = np.load(os.path.join(index_dir, CENTROIDS_NAME))
+    for record, list_id in zip(new_records, _assign(vectors, centroids)):
+        record["list"] = int(list_id)
+    records.extend(new_records)
+    write_jsonl(os.path.join(index_dir, RECORDS_NAME), records)
+    meta["count"] = len(records)
+    _save_meta(index_dir, meta)
+    return len(new_records)
+
+
+def load_index(index_dir, nprobe=DEFAULT_NPROBE):
+    """
+    Load an index for querying: centroids, records, the normalized vectors of
+    the indexed speeches (read once from the embedding store) and the inverted lists.
+    """
+    with open(os.path.join(index_dir, META_NAME), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    records = list(iter_jsonl(os.path.join(index_dir, RECORDS_NAME)))
+    centroids = np.load(os.path.join(index_dir, CENTROIDS_NAME))
+    _, stored = load_vectors(meta["store_dir"])
+    vectors = normalize_rows(stored[[record["row"] for record in records]])
+
+    list_ids = np.array([record["list"] for record in records], dtype=np.int64)
+    order = np.argsort(list_ids, kind="stable")
+    bounds = np.searchsorted(list_ids[order], np.arange(len(centroids) + 1))
+    lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(centroids))]
+
+    return {"dir": index_dir, "meta": meta, "records": records, "centroids": centroids,
+            "vectors": vectors, "lists": lists, "nprobe": nprobe, "encode": None}
+
+
+def search(index, vector, k=10, nprobe=None, exclude=None):
+    """
+    Top-k indexed speeches by cosine similarity to vector, scanning only the
+    nprobe closest lists. Returns dicts sorted by decreasing score.
+    """
+    q = normalize_rows(np.asarray(vector).reshape(1, -1))[0]
+    nprobe = min(nprobe or index["nprobe"], len(index["centroids"]))
+    probe = np.argpartition(index["centroids"] @ q, -nprobe)[-nprobe:]
+    candidates = np.concatenate([index["lists"][i] for i in probe])
+    if exclude is not None:
+        candidates = candidates[candidates != exclude]
+    if len(candidates) == 0:
+        return []
+
+    scores = index["vectors"][candidates] @ q
+    k = min(k, len(candidates))
+    top = np.argpartition(scores, -k)[-k:]
+    top = top[np.argsort(-scores[top])]
+
+    results = []
+    for i in top:
+        record = index["records"][candidates[i]]
+        results.append({"id": int(candidates[i]), "score": float(scores[i]), "speaker": record["speaker"],
+                        "date": record["date"], "time": record["time"], "preview": record["preview"]})
+    return results
+
+
+def query_id(index, speech_id, k=10, nprobe=None):
+    """
+    Speeches most similar to indexed speech `speech_id` (itself excluded).
+    """
+    return search(index, index["vectors"][speech_id], k, nprobe, exclude=speech_id)
+
+
+def query_text(index, text, k=10, nprobe=None, encode=None):
+    """
+    Speeches most similar to free text, encoded with the store's model (loaded
+    on the first query and kept on the index).
+    """
+    if encode is None:
+        if index["encode"] is None:
+            index["encode"] = _sentence_transformer_encoder(load_meta(index["meta"]["store_dir"])["model"])
+        encode = index["encode"]
+    return search(index, np.asarray(encode([text]))[0], k, nprobe)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Approximate nearest-neighbour index over the speech embeddings.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = commands.add_parser("build", help="build a fresh index from the whole corpus")
+    build_cmd.add_argument("corpus", help="compiled_speeches.csv or the Parquet dataset folder")
+    build_cmd.add_argument("store_dir", help="embedding store folder")
+    build_cmd.add_argument("index_dir", help="index folder")
+    build_cmd.add_argument("--nlist", type=int, help="number of lists (default: 4 * sqrt(N))")
+
+    add_cmd = commands.add_parser("add", help="add corpus speeches not indexed yet")
+    add_cmd.add_argument("corpus", help="compiled_speeches.csv or the Parquet dataset folder")
+    add_cmd.add_argument("index_dir", help="index folder")
+
+    query_cmd = commands.add_parser("query", help="find similar speeches")
+    query_cmd.add_argument("index_dir", help="index folder")
+    target = query_cmd.add_mutually_exclusive_group(required=True)
+    target.add_argument("--text", help="free text to search for")
+    target.add_argument("--id", type=int, help="id of an indexed speech")
+    query_cmd.add_argument("--k", type=int, default=10)
+    query_cmd.add_argument("--nprobe", type=int, default=DEFAULT_NPROBE, help="lists scanned per query")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_index(args.corpus, args.store_dir, args.index_dir, args.nlist)
+        print(f"✅ Done! {count} speeches indexed in:\n{args.index_dir}")
+    elif args.command == "add":
+        count = add_to_index(args.corpus, args.index_dir)
+        print(f"✅ Done! {count} new speeches added to:\n{args.index_dir}")
+    else:
+        index = load_index(args.index_dir, args.nprobe)
+        if args.text is not None:
+            query_text(index, args.text, 1)  # load the model outside the timing
+        started = time.perf_counter()
+        results = query_text(index, args.text, args.k) if args.text is not None else query_id(index, args.id, args.k)
+        print(f"🔍 {len(results)} results in {(time.perf_counter() - started) * 1000:.1f} ms")
+        for result in results:
+            print(f"{result['id']:>8}  {result['score']:.3f}  {result['date']} {result['time']}  "
+                  f"{result['speaker']}: {result['preview'][:80]}")
@@ -0,0 +1,248 @@
+# batch_runner.py
+# Unattended batch scheduler for the whole pipeline over a range of sessions.
+# - Discovers every eligible PDF under downloads/session_N for N in [start, end].
+# - Runs PDFs concurrently on a bounded process pool, longest (most pages) first,
+#   so one huge sitting does not start last and hold up the end of the batch.
+# - Retries a failing PDF, and after the last attempt quarantines it with the error
+#   in OCR_Outputs/quarantine/ so later runs skip it until asked to retry.
+# - A worker killed by the OS (e.g. out of memory on a long sitting) counts as a failed
+#   attempt for the PDFs that were running; the pool is restarted for the rest.
+# - With --incremental, finished PDFs are not skipped but rebuilt from the first stage
+#   whose input or code changed (see pipeline.run_pipeline_incremental).
+# - With --include-fullday, full-day PDFs are split into all of their debate blocks
+#   (pipeline multi_debate mode); they always run as a plain, non-incremental job.
+
+# ✅ Usage:
+# python batch_runner.py --start 210 --end 230
+# python batch_runner.py --start 210 --end 230 --jobs 16 --retries 2 --retry-quarantined
+# python batch_runner.py --start 1 --end 300 --incremental
+
+import os
+import sys
+import json
+import time
+import argparse
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from pdf2image import pdfinfo_from_path
+
+from pipeline import run_pipeline, run_pipeline_incremental, stage_output_paths, reading, MANIFEST_DIR
+
+# --- Input/Output Paths ---
+input_root = r"C:\Users\asus\OneDrive\Desktop\DataScrapping\downloads"
+output_root = r"C:\Users\asus\OneDrive\Desktop\NLP\MiniProject\OCR_Outputs"
+
+QUARANTINE_DIR = "quarantine"
+
+
+def _session_num(name):
+    return int(name.split("_")[1])
+
+
+def discover_pdfs(input_root, output_root, start_session_num, end_session_num, include_fullday=False):
+    """
+    List every PDF in the session range as a job dict, with the same
+    base_name scheme as one-by-one.py and its page count (0 if unreadable).
+    """
+    sessions = sorted(
+        [d for d in os.listdir(input_root) if d.startswith("session_")],
+        key=_session_num
+    )
+
+    jobs = []
+    for session in sessions:
+        if not (start_session_num <= _session_num(session) <= end_session_num):
+            continue
+
+        for root, dirs, files in os.walk(os.path.join(input_root, session)):
+            dir_name = os.path.basename(root)
+            if not dir_name:
+                continue
+
+            for file in files:
+                if not file.lower().endswith(".pdf"):
+                    continue
+                if "fullday" in file.lower() and not include_fullday:
+                    continue
+
+                pdf_path = os.path.join(root, file)
+                base_name = f"{dir_name}-{os.path.splitext(file)[0]}_{session}"
+                try:
+                    pages = pdfinfo_from_path(pdf_path, poppler_path=reading.poppler_path)["Pages"]
+                except Exception:
+                    pages = 0  # unreadable: let the pipeline raise the real error
+
+                jobs.append({
+                    "pdf_path": pdf_path,
+                    "session": session,
+                    "base_name": base_name,
+                    "pages": pages,
+                    "paths": stage_output_paths(output_root, base_name),
+                    "manifest": os.path.join(output_root, MANIFEST_DIR, f"{base_name}.json"),
+                    "multi_debate": "fullday" in file.lower(),
+                })
+    return jobs
+
+
+def _run_job(job, ocr_workers, keep_intermediates, incremental=False):
+    """
+    Run one PDF through the pipeline inside a pool worker.
+    Never raises: returns a status dict so the scheduler can retry or quarantine.
+    """
+    started = time.time()
+    try:
+        if incremental and not job["multi_debate"]:
+            speech_objects, rebuilt = run_pipeline_incremental(
+                job["pdf_path"], job["paths"], job["manifest"], workers=ocr_workers)
+            return {"ok": True, "speeches": len(speech_objects) if speech_objects is not None else None,
+                    "rebuilt": rebuilt, "seconds": time.time() - started}
+
+        speech_objects = run_pipeline(
+            job["pdf_path"], job["paths"]["final"],
+            intermediate_paths=job["paths"] if keep_intermediates else None,
+            workers=ocr_workers,
+            multi_debate=job["multi_debate"],
+        )
+        return {"ok": True, "speeches": len(speech_objects), "rebuilt": None, "seconds": time.time() - started}
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}",
+                "traceback": traceback.format_exc(), "seconds": time.time() - started}
+
+
+def _quarantine_path(output_root, job):
+    return os.path.join(output_root, QUARANTINE_DIR, f"{job['base_name']}.json")
+
+
+def _quarantine(output_root, job, attempt, result):
+    q_path = _quarantine_path(output_root, job)
+    os.makedirs(os.path.dirname(q_path), exist_ok=True)
+    with open(q_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "pdf_path": job["pdf_path"],
+            "attempts": attempt,
+            "error": result["error"],
+            "traceback": result["traceback"],
+            "quarantined_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }, f, ensure_ascii=False, indent=4)
+
+
+def run_batch(jobs, output_root, max_jobs, ocr_workers=1, retries=1,
+              keep_intermediates=False, retry_quarantined=False, incremental=False):
+    """
+    Run the jobs on a pool of max_jobs processes, longest first.
+    At most max_jobs jobs are submitted at a time, so when a worker is killed by
+    the OS (e.g. out of memory) and the pool breaks, the jobs in flight are known:
+    each gets a failed attempt and the pool is recreated for the rest.
+    Returns counts of done/skipped/failed PDFs.
+    """
+    summary = {"done": 0, "skipped": 0, "quarantined": 0}
+
+    pending = []
+    for job in jobs:
+        if os.path.exists(job["paths"]["final"]) and (job["multi_debate"] or not incremental):
+            summary["skipped"] += 1
+        elif os.path.exists(_quarantine_path(output_root, job)) and not retry_quarantined:
+            summary["skipped"] += 1
+        else:
+            pending.append(job)
+
+    # longest first: the biggest sittings start immediately instead of ending up as the tail
+    pending.sort(key=lambda j: j["pages"], reverse=True)
+    print(f"📋 {len(pending)} PDFs to process, {summary['skipped']} already done or quarantined.")
+
+    queue = deque((job, 1) for job in pending)
+    in_flight = {}
+    pool = ProcessPoolExecutor(max_workers=max_jobs)
+    try:
+        while queue or in_flight:
+            while queue and len(in_flight) < max_jobs:
+                job, attempt = queue.popleft()
+                in_flight[pool.submit(_run_job, job, ocr_workers, keep_intermediates, incremental)] = (job, attempt)
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            finished = [(future, in_flight.pop(future)) for future in done]
+            pool_broken = False
+            for future, _ in finished:
+                if isinstance(future.exception(), BrokenProcessPool):
+                    pool_broken = True
+            if pool_broken:
+                # every job still in flight died with the pool: count the crash against all of them
+                finished.extend(in_flight.items())
+                in_flight = {}
+                pool.shutdown(wait=True)
+                pool = ProcessPoolExecutor(max_workers=max_jobs)
+                print("💥 A worker process was killed (out of memory?); restarting the pool.")
+
+            for future, (job, attempt) in finished:
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    result = {"ok": False, "error": "BrokenProcessPool: worker process was killed while this PDF was running",
+                              "traceback": traceback.format_exc(), "seconds": None}
+
+                if result["ok"]:
+                    summary["done"] += 1
+                    q_path = _quarantine_path(output_root, job)
+                    if os.path.exists(q_path):
+                        os.remove(q_path)
+                    rebuilt = ""
+                    if result["rebuilt"] is not None:
+                        rebuilt = f" [rebuilt: {', '.join(result['rebuilt']) or 'nothing'}]"
+                    speeches = "final output unchanged" if result["speeches"] is None else f"{result['speeches']} speeches"
+                    print(f"✅ {job['base_name']} ({job['pages']} pages): "
+                          f"{speeches} in {result['seconds']:.1f}s{rebuilt}")
+                elif attempt <= retries:
+                    print(f"🔁 {job['base_name']} failed (attempt {attempt}): {result['error']}, retrying...")
+                    queue.append((job, attempt + 1))
+                else:
+                    summary["quarantined"] += 1
+                    _quarantine(output_root, job, attempt, result)
+                    print(f"❌ {job['base_name']} quarantined after {attempt} attempts: {result['error']}")
+    finally:
+        pool.shutdown(wait=True)
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pipeline over a range of sessions, unattended.")
+    parser.add_argument("--start", type=int, required=True, help="first session number (e.g. 210)")
+    parser.add_argument("--end", type=int, required=True, help="last session number (e.g. 230)")
+    parser.add_argument("--input-root", default=input_root, help="folder holding the session_N folders")
+    parser.add_argument("--output-root", default=output_root, help="OCR_Outputs folder")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="PDFs processed at the same time (default: all cores)")
+    parser.add_argument("--ocr-workers", type=int, default=1,
+                        help="OCR processes per PDF (keep jobs × ocr-workers ≈ cores)")
+    parser.add_argument("--retries", type=int, default=1, help="extra attempts before a PDF is quarantined")
+    parser.add_argument("--retry-quarantined", action="store_true", help="also retry previously quarantined PDFs")
+    parser.add_argument("--include-fullday", action="store_true", help="also process fullday PDFs, split into every debate block")
+    parser.add_argument("--keep-intermediates", action="store_true",
+                        help="also write every stage's output (for debugging)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="keep stage outputs + manifests and rebuild only stages whose input or code changed")
+    args = parser.parse_args()
+
+    print("🔍 Discovering PDFs...")
+    jobs = discover_pdfs(args.input_root, args.output_root, args.start, args.end,
+                         include_fullday=args.include_fullday)
+    print(f"📚 Found {len(jobs)} PDFs in sessions {args.start}-{args.end}.")
+
+    started = time.time()
+    summary = run_batch(jobs, args.output_root, args.jobs, ocr_workers=args.ocr_workers,
+                        retries=args.retries, keep_intermediates=args.keep_intermediates,
+                        retry_quarantined=args.retry_quarantined, incremental=args.incremental)
+
+    print("\n" + "=" * 100)
+    print(f"🎉 Batch finished in {time.time() - started:.1f}s: {summary['done']} done, "
+          f"{summary['skipped']} skipped, {summary['quarantined']} quarantined.")
+    if summary["quarantined"]:
+        print(f"📁 See {os.path.join(args.output_root, QUARANTINE_DIR)} for errors.")
+    print("=" * 100)
+    sys.exit(1 if summary["quarantined"] else 0)
+
+
+if __name__ == "__main__":
+    main()
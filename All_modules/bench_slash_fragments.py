@@ -0,0 +1,83 @@
+# bench_slash_fragments.py
+# Regression benchmark for the slash-fragment remover in 3_cleaner.py.
+# - Builds pathological OCR-like lines (long runs of dots, spaces and letters with
+#   slashes far apart or missing) at growing lengths.
+# - Checks remove_slash_fragments gives exactly the same result as RE_ANY_CONTAIN_SLASH.sub.
+# - Checks time per character stays flat as lines grow (bounded per-line time),
+#   and exits non-zero on a mismatch or a regression.
+
+# ✅ Usage:
+# python bench_slash_fragments.py
+# python bench_slash_fragments.py --max-ns-per-char 200
+
+import sys
+import time
+import argparse
+import importlib
+
+cleaner = importlib.import_module("3_cleaner")
+
+LENGTHS = [1_000, 10_000, 100_000]
+
+# name -> function building a line of roughly n characters
+PATHOLOGICAL_LINES = {
+    "dots+spaces, slash at end": lambda n: ". " * (n // 2) + "/",
+    "letters+dots, no slash": lambda n: "a. " * (n // 3),
+    "slash every 3 chars": lambda n: "./ " * (n // 3),
+    "slash every 200 chars": lambda n: ("a. " * 66 + "/ ") * (n // 200),
+    "page-ref noise": lambda n: "SCH-TDB/4.45/3K " * (n // 16),
+}
+
+
+def _best_time(func, line, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(line)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the linear-time slash-fragment remover.")
+    parser.add_argument("--max-ns-per-char", type=float, default=100.0,
+                        help="fail if the linear remover is slower than this on any line")
+    parser.add_argument("--max-growth", type=float, default=3.0,
+                        help="fail if ns/char on the longest line exceeds the shortest by this factor")
+    args = parser.parse_args()
+
+    regex_sub = lambda s: cleaner.RE_ANY_CONTAIN_SLASH.sub('', s)
+    failures = []
+
+    print(f"{'case':<28}{'chars':>9}{'regex ns/char':>15}{'linear ns/char':>16}{'speedup':>9}")
+    print("-" * 77)
+    for name, build in PATHOLOGICAL_LINES.items():
+        per_char = []
+        for n in LENGTHS:
+            line = build(n)
+            if cleaner.remove_slash_fragments(line) != regex_sub(line):
+                failures.append(f"{name} @ {len(line)}: output differs from RE_ANY_CONTAIN_SLASH")
+                continue
+
+            regex_ns = _best_time(regex_sub, line) / len(line) * 1e9
+            linear_ns = _best_time(cleaner.remove_slash_fragments, line) / len(line) * 1e9
+            per_char.append(linear_ns)
+            print(f"{name:<28}{len(line):>9}{regex_ns:>15.1f}{linear_ns:>16.1f}{regex_ns / linear_ns:>8.1f}x")
+
+            if linear_ns > args.max_ns_per_char:
+                failures.append(f"{name} @ {len(line)}: {linear_ns:.1f} ns/char > {args.max_ns_per_char}")
+
+        if len(per_char) == len(LENGTHS) and per_char[-1] > per_char[0] * args.max_growth:
+            failures.append(f"{name}: ns/char grew {per_char[-1] / per_char[0]:.1f}x from "
+                            f"{LENGTHS[0]} to {LENGTHS[-1]} chars (not linear)")
+
+    print()
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Slash-fragment remover matches the regex and stays linear on every pathological line.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# bench_speaker_extraction.py
+# Benchmark of the batched speaker extraction in 5_object_making.py.
+# - Rebuilds raw speeches ("SPEAKER: speech") from speecheeees_cleaned.json,
+#   repeated to a realistic batch size.
+# - Checks extract_speakers_batch gives exactly the same objects as calling
+#   extract_speaker_clean_v2 on every speech.
+# - Prints both timings and exits non-zero on a mismatch or if the batch API is
+#   not at least --min-speedup times faster.
+
+# ✅ Usage:
+# python bench_speaker_extraction.py
+# python bench_speaker_extraction.py --input "speecheeees_cleaned.json" --copies 50 --min-speedup 1.5
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+
+object_making = importlib.import_module("5_object_making")
+
+default_input = os.path.join(os.path.dirname(os.path.abspath(__file__)), "speecheeees_cleaned.json")
+
+
+def _best_time(func, arg, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched vs per-speech speaker extraction.")
+    parser.add_argument("--input", default=default_input, help="speech-objects JSON to rebuild speeches from")
+    parser.add_argument("--copies", type=int, default=20, help="how many times the speeches are repeated")
+    parser.add_argument("--min-speedup", type=float, default=1.0,
+                        help="fail if the batch API is not at least this much faster")
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        objects = json.load(f)
+    speeches = [f"{obj['speaker']}: {obj['speech']}" for obj in objects] * args.copies
+    chars = sum(len(s) for s in speeches)
+    print(f"📊 {len(speeches)} speeches, {chars} characters")
+
+    per_speech = lambda texts: [object_making.extract_speaker_clean_v2(t) for t in texts]
+    batched = lambda texts: [obj for start in range(0, len(texts), object_making.BATCH_SIZE)
+                             for obj in object_making.extract_speakers_batch(
+                                 texts[start:start + object_making.BATCH_SIZE])]
+
+    if batched(speeches) != per_speech(speeches):
+        print("❌ extract_speakers_batch output differs from extract_speaker_clean_v2")
+        sys.exit(1)
+
+    old = _best_time(per_speech, speeches)
+    new = _best_time(batched, speeches)
+    print(f"{'extract_speaker_clean_v2':<28}{old:>9.3f}s{old / chars * 1e9:>10.1f} ns/char")
+    print(f"{'extract_speakers_batch':<28}{new:>9.3f}s{new / chars * 1e9:>10.1f} ns/char")
+    print(f"⚡ Speedup: {old / new:.1f}x")
+
+    if old / new < args.min_speedup:
+        print(f"❌ Speedup {old / new:.1f}x is below {args.min_speedup}x")
+        sys.exit(1)
+    print("✅ Batch API matches the per-speech function.")
+
+
+if __name__ == "__main__":
+    main()
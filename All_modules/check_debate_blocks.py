@@ -0,0 +1,89 @@
+# check_debate_blocks.py
+# Regression check for the multi-debate mode of 2_cropping.py (iter_debate_blocks)
+# on the real Zero Hour sample in input_for_codes/cleaner-inp.txt.
+# - No block starts or ends with a leftover "(" / ")" and no "(Ends)" / "(समाप्त)"
+#   marker (nor a piece of one) is left in the block text.
+# - The "I associate myself ..." / "... सम्बद्ध करता हूँ" speeches stay in the block
+#   of the mention they follow, and a speech carried over to the next reporter
+#   ("(Contd. by ...)" then "NAME (CONTD.):") is not split.
+# - Every word of the sample ends up in exactly one block, in order.
+# - Exits non-zero on a failure.
+
+# ✅ Usage:
+# python check_debate_blocks.py
+# python check_debate_blocks.py "../input_for_codes/cleaner-inp.txt"
+
+import os
+import re
+import sys
+import importlib
+
+cropping = importlib.import_module("2_cropping")
+speaker_wise = importlib.import_module("4_speaker_wise")
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "input_for_codes", "cleaner-inp.txt")
+
+RE_MARKER_LEFTOVER = re.compile(r"\(\s*(?:Ends|समाप्त)|(?:Ends|समाप्त)\s*\)")
+
+# (text of a mention, text that must be in the same block)
+SAME_BLOCK = [
+    ("SHRI SUKHENDU SEKHAR ROY (WEST BENGAL)", "with the matter raised by Shri Sukhendu Sekhar Roy."),
+    ("ताकि इन लोगों के खिलाफ उचित", "श्री विवेक गुप्ता (पश्चिमी बंगाल): महोदय, मैं स्वयं को इस विषय के साथ सम्बद्ध"),
+    ("CONCERN OVER INCREASE IN FOOD ADULTERATION IN", "SHRI K.K. RAGESH: 8, | will make only two points"),
+    ("NEED FOR PROMOTING DEVELOPMENT TOURISM", "DR. VINAY P. SAHASRABUDDHE (CONTD.):"),
+    ("NEED FOR PROMOTING DEVELOPMENT TOURISM", "SHRI AJAY SANCHETI (MAHARASHTRA): Sir, | associate myself"),
+    ("PROBLEM DUE TO NON-AVAILABILITY OF TRACK AND OTHER", "श्री बी. के. हरिप्रसाद (Holes): महोदय, मैं इस विषय से"),
+]
+
+
+def block_of(blocks, needle):
+    found = [b["debate"] for b in blocks if needle in b["text"]]
+    return found[0] if len(found) == 1 else None
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else SAMPLE_PATH
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    blocks = list(cropping.iter_debate_blocks(text))
+    failures = []
+
+    if [b["debate"] for b in blocks] != list(range(1, len(blocks) + 1)):
+        failures.append(f"blocks not numbered 1..{len(blocks)}")
+
+    for b in blocks:
+        lines = b["text"].split("\n")
+        first, last = lines[0].strip(), lines[-1].strip()
+        if any(line.count("(") != line.count(")") or line.startswith(")") or line.endswith("(")
+               for line in (first, last)):
+            failures.append(f"block {b['debate']} starts or ends with a stray paren: {first[:40]!r} ... {last[-40:]!r}")
+        leftover = RE_MARKER_LEFTOVER.search(b["text"])
+        if leftover:
+            failures.append(f"block {b['debate']} still holds an end marker: {leftover.group()!r}")
+
+        # a block never opens with an association: it belongs to the mention before it
+        for line in lines:
+            head = speaker_wise.RE_SPEAKER_HEAD.match(line.strip())
+            if cropping.RE_TOPIC_HEADING.fullmatch(line.strip()) or (head and not cropping.RE_CHAIR.match(line.strip())):
+                if head and cropping.RE_ASSOCIATION.search(line):
+                    failures.append(f"block {b['debate']} opens with an association: {line[:60]!r}")
+                break
+
+    for mention, follower in SAME_BLOCK:
+        at, follower_at = block_of(blocks, mention), block_of(blocks, follower)
+        if at is None or at != follower_at:
+            failures.append(f"{follower[:40]!r} (block {follower_at}) is not in the block of {mention[:40]!r} (block {at})")
+
+    whole = cropping._crop_span(text, 0, len(text), cropping.RE_BLOCK_MARKERS)
+    if " ".join(b["text"] for b in blocks).split() != whole.split():
+        failures.append("the blocks do not add up to the whole sample (text lost, repeated or reordered)")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"✅ {len(blocks)} debate blocks in {path}: markers removed, associations kept with their mention.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# check_topic_classifier.py
+# Check of topic_classifier.py against a stub model server on localhost (no ollama needed).
+# - The stub answers POST /api/generate like ollama, with "Topic: <speech>" for every
+#   prompt, but fails the first attempt of every third speech with a 503 and always
+#   fails the speeches containing "ALWAYS FAILS".
+# - Window: no more than 2 x workers prompts are built ahead of the answers.
+# - Retry: the 503s are retried and every other speech gets its label, in order.
+# - Resume: a checkpoint cut off in the middle of a line only sends the speeches
+#   not labelled yet, and the records appended after the cut line stay readable.
+# - Output: failed speeches get "Topic: ERROR ..." and are retried on the next run;
+#   no more than --workers requests reach the server at a time.
+# - Exits non-zero on a failure.
+
+# ✅ Usage:
+# python check_topic_classifier.py
+
+import os
+import sys
+import json
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import topic_classifier
+
+WORKERS = 3
+SPEECHES = [f"speech {i} on subject {i % 17}" for i in range(40)] + ["speech 5 on subject 5", "ALWAYS FAILS"]
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.lock = threading.Lock()
+        self.requests = []   # speech of every request received
+        self.active = 0
+        self.max_active = 0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as the client expects
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        speech = body["prompt"].rsplit("Speech Input:\n", 1)[1].rsplit("\n\nOutput:", 1)[0]
+        with server.lock:
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            attempt = server.requests.count(speech)
+            server.requests.append(speech)
+        try:
+            number = int(speech.split()[1]) if speech.startswith("speech") else 0
+            if "ALWAYS FAILS" in speech or (attempt == 0 and number % 3 == 0):
+                self._answer(503, {"error": "model busy"})
+            else:
+                self._answer(200, {"model": body["model"], "response": f"Topic: {speech}\n", "done": True})
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _answer(self, status, data):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    failures = []
+    topic_classifier.BACKOFF_SECONDS = 0.01
+    server = StubServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = topic_classifier.make_client(f"http://127.0.0.1:{server.server_port}", timeout=10, retries=2)
+
+    # count prompts built and answers returned, to check the submission window
+    window = {"built": 0, "answered": 0, "max_ahead": 0}
+    window_lock = threading.Lock()
+    build_prompt = topic_classifier.build_prompt
+
+    def counting_build_prompt(speech):
+        with window_lock:
+            window["built"] += 1
+            window["max_ahead"] = max(window["max_ahead"], window["built"] - window["answered"])
+        return build_prompt(speech)
+
+    def generate(prompt):
+        try:
+            return client(prompt)
+        finally:
+            with window_lock:
+                window["answered"] += 1
+
+    topic_classifier.build_prompt = counting_build_prompt
+    expected = [f"Topic: {speech}" for speech in SPEECHES]
+    unique = len(set(SPEECHES))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, "topics.checkpoint.jsonl")
+
+        # retry: every first-attempt 503 is retried, only "ALWAYS FAILS" is left
+        topics = topic_classifier.classify_speeches(SPEECHES, checkpoint, generate, WORKERS)
+        if topics[:-1] != expected[:-1]:
+            failures.append("retried speeches did not all get their label, in order")
+        if not topics[-1].startswith("Topic: ERROR"):
+            failures.append(f"a speech failing every retry got {topics[-1]!r}, not 'Topic: ERROR ...'")
+        if server.max_active > WORKERS:
+            failures.append(f"{server.max_active} requests in flight with {WORKERS} workers")
+        if window["max_ahead"] > 2 * WORKERS:
+            failures.append(f"{window['max_ahead']} prompts queued at once, expected at most {2 * WORKERS}")
+        if len(topic_classifier.load_checkpoint(checkpoint)) != unique - 1:
+            failures.append("the checkpoint does not hold exactly the labelled speeches")
+
+        # resume: keep 10 records, cut the 11th in the middle as a crash would
+        with open(checkpoint, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        with open(checkpoint, "w", encoding="utf-8") as f:
+            f.writelines(lines[:10])
+            f.write(lines[10][:len(lines[10]) // 2])
+        server.requests.clear()
+        topics = topic_classifier.classify_speeches(SPEECHES, checkpoint, generate, WORKERS)
+        labelled_before = {json.loads(line)["topic"][len("Topic: "):] for line in lines[:10]}
+        if labelled_before & set(server.requests):
+            failures.append("speeches already in the checkpoint were sent again")
+        sent_once = len(set(server.requests) - {"ALWAYS FAILS"})
+        if sent_once != unique - 1 - 10:
+            failures.append(f"resume sent {sent_once} speeches, expected {unique - 1 - 10}")
+        if topics[:-1] != expected[:-1] or not topics[-1].startswith("Topic: ERROR"):
+            failures.append("resumed run did not return the same labels")
+
+        # the cut-off line is skipped and every record after it is on its own line
+        with open(checkpoint, "r", encoding="utf-8") as f:
+            readable = sum(1 for line in f if line.strip() and _is_json(line))
+        if readable != unique - 1:
+            failures.append(f"{readable} readable checkpoint records after the resume, expected {unique - 1}")
+
+        # output: the failed speech is the only one retried on a third run
+        server.requests.clear()
+        topic_classifier.classify_speeches(SPEECHES, checkpoint, generate, WORKERS)
+        if set(server.requests) != {"ALWAYS FAILS"}:
+            failures.append(f"third run sent {sorted(set(server.requests))}, expected only the failed speech")
+        if topic_classifier.parse_topic(expected[0]) != SPEECHES[0]:
+            failures.append("parse_topic did not read the phrase after 'Topic:'")
+
+    server.shutdown()
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Retries, resume from a cut checkpoint and labels all match the stub server.")
+
+
+def _is_json(line):
+    try:
+        json.loads(line)
+        return True
+    except json.JSONDecodeError:
+        return False
+
+
+if __name__ == "__main__":
+    main()
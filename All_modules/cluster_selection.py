@@ -0,0 +1,214 @@
+# cluster_selection.py
+# K sweep for choosing the number of speech clusters (K_FINAL in the notebook).
+# - Every K is fitted in its own process (all cores), on the L2-normalized
+#   embeddings shared through a memory-mapped .npy instead of being pickled.
+# - Above MINIBATCH_MIN_N speeches, MiniBatchKMeans is used instead of KMeans.
+# - The cosine silhouette is computed on one fixed stratified sample (the same
+#   speeches for every K), not on all N points.
+# - Labels of every K are saved (labels_k<K>.npy) next to results.json, so
+#   picking K_FINAL is a file read, and an interrupted sweep resumes where it stopped.
+
+# ✅ Usage:
+# python cluster_selection.py "compiled_speeches_parquet" "embeddings" "k_sweep"
+# python cluster_selection.py "compiled_speeches.csv" "embeddings" "k_sweep" --k-min 5 --k-max 59 --sample-size 5000 --strata speaker
+#
+# From the notebook:
+#   results = sweep_k(X, range(5, 60), "k_sweep", strata=df["date"])
+#   K_FINAL = best_k("k_sweep")
+#   df["cluster_label"] = load_labels("k_sweep", K_FINAL)
+
+import os
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from similarity import normalize_rows
+
+MINIBATCH_MIN_N = 20000
+DEFAULT_SAMPLE_SIZE = 10000
+RANDOM_STATE = 42
+
+VECTORS_NAME = "vectors.npy"
+SAMPLE_NAME = "sample.npy"
+RESULTS_NAME = "results.json"
+
+
+def stratified_sample(n, size, strata=None, random_state=RANDOM_STATE):
+    """
+    Sorted indices of about `size` of the n points, drawn from every stratum in
+    proportion to its size (at least one point per stratum). Without strata it
+    is a plain random sample. Same arguments, same sample.
+    """
+    rng = np.random.default_rng(random_state)
+    if size >= n:
+        return np.arange(n)
+    if strata is None:
+        return np.sort(rng.choice(n, size, replace=False))
+
+    _, groups = np.unique(np.asarray(strata).astype(str), return_inverse=True)
+    picked = []
+    for group in range(groups.max() + 1):
+        members = np.flatnonzero(groups == group)
+        take = min(len(members), max(1, round(size * len(members) / n)))
+        picked.append(rng.choice(members, take, replace=False))
+    return np.sort(np.concatenate(picked))
+
+
+def labels_path(out_dir, k):
+    return os.path.join(out_dir, f"labels_k{k}.npy")
+
+
+def _fit_one_k(k, out_dir, minibatch, random_state):
+    """
+    Fit K clusters in a pool worker (one BLAS/OpenMP thread, the pool gives the
+    parallelism), save the labels and return k, inertia, silhouette, seconds.
+    """
+    from threadpoolctl import threadpool_limits
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    from sklearn.metrics import silhouette_score
+
+    started = time.perf_counter()
+    X = np.load(os.path.join(out_dir, VECTORS_NAME), mmap_mode="r")
+    sample = np.load(os.path.join(out_dir, SAMPLE_NAME))
+    with threadpool_limits(1):
+        if minibatch:
+            model = MiniBatchKMeans(n_clusters=k, batch_size=4096, n_init=3, random_state=random_state)
+        else:
+            model = KMeans(n_clusters=k, n_init="auto", random_state=random_state)
+        labels = model.fit_predict(X)
+        sample_labels = labels[sample]
+        silhouette = (float(silhouette_score(X[sample], sample_labels, metric="cosine"))
+                      if 1 < len(np.unique(sample_labels)) < len(sample) else None)
+
+    tmp_path = labels_path(out_dir, k) + ".part.npy"
+    np.save(tmp_path, labels.astype(np.int32))
+    os.replace(tmp_path, labels_path(out_dir, k))
+    return k, float(model.inertia_), silhouette, time.perf_counter() - started
+
+
+def _load_sweep(out_dir):
+    """
+    (params, {k: result}) of the sweep in out_dir, or (None, {}) if there is none.
+    """
+    results_path = os.path.join(out_dir, RESULTS_NAME)
+    if not os.path.exists(results_path):
+        return None, {}
+    with open(results_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data["params"], {int(k): result for k, result in data["results"].items()}
+
+
+def load_results(out_dir):
+    return _load_sweep(out_dir)[1]
+
+
+def _save_results(out_dir, params, results):
+    results_path = os.path.join(out_dir, RESULTS_NAME)
+    tmp_path = results_path + ".part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"params": params, "results": {str(k): results[k] for k in sorted(results)}},
+                  f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, results_path)
+
+
+def _sweep_params(n, sample_size, strata, minibatch, random_state):
+    """
+    Everything besides the vectors that the stored labels and silhouettes depend on.
+    """
+    strata_hash = None
+    if strata is not None:
+        strata_hash = hashlib.sha256("\x1f".join(np.asarray(strata).astype(str)).encode("utf-8")).hexdigest()
+    return {"n": n, "sample_size": sample_size, "strata_sha256": strata_hash,
+            "minibatch": bool(minibatch), "random_state": random_state}
+
+
+def sweep_k(X, ks, out_dir, workers=None, sample_size=DEFAULT_SAMPLE_SIZE, strata=None,
+            minibatch=None, random_state=RANDOM_STATE):
+    """
+    Cluster the normalized X for every K in ks, in parallel, and store inertia,
+    sampled cosine silhouette and labels per K in out_dir.
+    K values already in results.json are not refitted, as long as the vectors
+    and the sweep parameters (sample size, strata, minibatch, random_state) are
+    the same; otherwise the sweep starts over.
+    Returns {k: {"inertia", "silhouette", "seconds", "labels"}}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    X = normalize_rows(X)
+    minibatch = len(X) >= MINIBATCH_MIN_N if minibatch is None else minibatch
+    params = _sweep_params(len(X), sample_size, strata, minibatch, random_state)
+
+    vectors_path = os.path.join(out_dir, VECTORS_NAME)
+    old_params, results = _load_sweep(out_dir)
+    if old_params is not None and old_params != params:
+        print("⚠️ Sweep parameters changed since the last sweep, starting over.")
+        old_params, results = None, {}
+    elif old_params is not None and not (os.path.exists(vectors_path)
+                                         and np.array_equal(np.load(vectors_path, mmap_mode="r"), X)):
+        print("⚠️ Embeddings changed since the last sweep, starting over.")
+        old_params, results = None, {}
+    if old_params is None:
+        np.save(vectors_path, X)
+        np.save(os.path.join(out_dir, SAMPLE_NAME), stratified_sample(len(X), sample_size, strata, random_state))
+        _save_results(out_dir, params, results)
+
+    todo = [k for k in ks if k not in results and 1 < k <= len(X)]
+    print(f"🧮 Fitting {len(todo)} values of K on {len(X)} speeches "
+          f"({'MiniBatchKMeans' if minibatch else 'KMeans'}, {len(results)} already done)...")
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = [pool.submit(_fit_one_k, k, out_dir, minibatch, random_state) for k in todo]
+        for future in as_completed(futures):
+            try:
+                k, inertia, silhouette, seconds = future.result()
+            except Exception as e:
+                print(f"❌ Error fitting K: {e}")
+                continue
+            results[k] = {"inertia": inertia, "silhouette": silhouette, "seconds": round(seconds, 3),
+                          "labels": os.path.basename(labels_path(out_dir, k))}
+            _save_results(out_dir, params, results)
+            print(f"✅ K={k:<4} inertia={inertia:.2f}  silhouette={silhouette}  ({seconds:.1f}s)")
+    return {k: results[k] for k in sorted(results)}
+
+
+def best_k(out_dir):
+    """
+    K with the highest sampled cosine silhouette.
+    """
+    results = {k: r for k, r in load_results(out_dir).items() if r["silhouette"] is not None}
+    return max(results, key=lambda k: results[k]["silhouette"])
+
+
+def load_labels(out_dir, k):
+    """
+    Cluster label of every speech for K clusters, as saved by the sweep.
+    """
+    return np.load(labels_path(out_dir, k))
+
+
+if __name__ == "__main__":
+    from ann_index import read_corpus
+    from embedding_store import DEFAULT_MODEL, load_meta, embed_texts
+
+    parser = argparse.ArgumentParser(description="Parallel K sweep over the speech embeddings.")
+    parser.add_argument("corpus", help="compiled_speeches.csv or the Parquet dataset folder")
+    parser.add_argument("store_dir", help="embedding store folder (new speeches are encoded)")
+    parser.add_argument("out_dir", help="folder for results.json and the labels of every K")
+    parser.add_argument("--k-min", type=int, default=5)
+    parser.add_argument("--k-max", type=int, default=59)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="values of K fitted at the same time (default: all cores)")
+    parser.add_argument("--sample-size", type=int, default=DEFAULT_SAMPLE_SIZE,
+                        help="speeches in the silhouette sample")
+    parser.add_argument("--strata", choices=["date", "time", "speaker"], default="date",
+                        help="corpus column the silhouette sample is stratified on")
+    args = parser.parse_args()
+
+    df = read_corpus(args.corpus)
+    model_name = (load_meta(args.store_dir) or {}).get("model", DEFAULT_MODEL)
+    X = embed_texts(df["speech"].tolist(), args.store_dir, model_name=model_name)
+    results = sweep_k(X, range(args.k_min, args.k_max + 1), args.out_dir, workers=args.workers,
+                      sample_size=args.sample_size, strata=df[args.strata])
+    print(f"✅ Done! Best K by silhouette: {best_k(args.out_dir)} (results in {args.out_dir})")
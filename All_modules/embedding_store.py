@@ -0,0 +1,184 @@
+# embedding_store.py
+# Persistent, batched sentence embeddings for the compiled speech corpus.
+# - Speeches are encoded in batches sorted by length (less padding per batch),
+#   instead of one model.encode call per DataFrame row.
+# - Vectors live in a memory-mapped float16/float32 matrix on disk, one row per
+#   distinct speech, keyed by the sha256 of its text; the order of rows is kept
+#   in meta.json.
+# - Later runs only encode speeches whose text is not in the store yet.
+
+# ✅ Usage:
+# python embedding_store.py "compiled_speeches_parquet" "embeddings"
+# python embedding_store.py "compiled_speeches.csv" "embeddings" --column speech --batch-size 128 --dtype float32
+#
+# From the notebook:
+#   X = embed_texts(df["clean_speech"].tolist(), "embeddings")   # (len(df), dim), new speeches only are encoded
+
+import os
+import json
+import hashlib
+import argparse
+import numpy as np
+
+DEFAULT_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_DTYPE = "float16"
+
+VECTORS_NAME = "vectors.npy"
+META_NAME = "meta.json"
+MIN_CAPACITY = 1024
+
+
+def text_key(text):
+    """
+    Store key of a speech: sha256 of its UTF-8 text.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def load_meta(store_dir):
+    meta_path = os.path.join(store_dir, META_NAME)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_meta(store_dir, meta):
+    meta_path = os.path.join(store_dir, META_NAME)
+    tmp_path = meta_path + ".part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_path, meta_path)
+
+
+def load_vectors(store_dir):
+    """
+    (keys, vectors) of the store: keys[i] is the text key of row i and vectors is
+    a read-only memory map of shape (len(keys), dim). Nothing is read into RAM.
+    """
+    meta = load_meta(store_dir)
+    if meta is None:
+        raise FileNotFoundError(f"No embedding store in {store_dir}")
+    vectors = np.load(os.path.join(store_dir, VECTORS_NAME), mmap_mode="r")
+    return meta["keys"], vectors[:len(meta["keys"])]
+
+
+def _grow(store_dir, rows_needed, dim, dtype):
+    """
+    Make vectors.npy hold at least rows_needed rows (capacity doubles, so
+    appends are amortized); returns it opened read/write.
+    """
+    path = os.path.join(store_dir, VECTORS_NAME)
+    old = np.load(path, mmap_mode="r+") if os.path.exists(path) else None
+    if old is not None and old.shape[0] >= rows_needed:
+        return old
+
+    capacity = max(MIN_CAPACITY, rows_needed, 2 * (old.shape[0] if old is not None else 0))
+    tmp_path = path + ".part"
+    grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=(capacity, dim))
+    if old is not None:
+        grown[:old.shape[0]] = old
+        del old
+    grown.flush()
+    del grown
+    os.replace(tmp_path, path)
+    return np.load(path, mmap_mode="r+")
+
+
+def _sentence_transformer_encoder(model_name):
+    from sentence_transformers import SentenceTransformer  # only needed when encoding
+    model = SentenceTransformer(model_name)
+    return lambda batch: model.encode(batch, batch_size=len(batch), convert_to_numpy=True,
+                                      show_progress_bar=False)
+
+
+def encode_by_length(encode, texts, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Encode texts in batches of similar length (one padded length per batch)
+    and return the vectors in the original order.
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    vectors = None
+    for start in range(0, len(order), batch_size):
+        batch_ids = order[start:start + batch_size]
+        batch_vectors = np.asarray(encode([texts[i] for i in batch_ids]), dtype=np.float32)
+        if vectors is None:
+            vectors = np.empty((len(texts), batch_vectors.shape[1]), dtype=np.float32)
+        vectors[batch_ids] = batch_vectors
+    return vectors
+
+
+def embed_texts(texts, store_dir, model_name=DEFAULT_MODEL, batch_size=DEFAULT_BATCH_SIZE,
+                dtype=DEFAULT_DTYPE, encode=None):
+    """
+    Vectors for texts, shape (len(texts), dim), in the order given. Texts already
+    in the store are read from it; only the others are encoded (with `encode`, a
+    function list of str → array, default the sentence-transformers model) and
+    appended to the store.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    meta = load_meta(store_dir) or {"model": model_name, "dtype": dtype, "dim": None, "keys": []}
+    if meta["model"] != model_name:
+        raise ValueError(f"Store {store_dir} holds {meta['model']} vectors, not {model_name}")
+
+    row_of = {key: i for i, key in enumerate(meta["keys"])}
+    keys = [text_key(text) for text in texts]
+
+    # distinct texts the store does not know yet
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in row_of and key not in missing:
+            missing[key] = text
+
+    if missing:
+        print(f"🧮 Encoding {len(missing)} new speeches ({len(row_of)} already in the store)...")
+        encode = encode or _sentence_transformer_encoder(model_name)
+        new_vectors = encode_by_length(encode, list(missing.values()), batch_size)
+        meta["dim"] = meta["dim"] or int(new_vectors.shape[1])
+
+        start = len(meta["keys"])
+        vectors = _grow(store_dir, start + len(missing), meta["dim"], meta["dtype"])
+        vectors[start:start + len(missing)] = new_vectors
+        vectors.flush()
+        del vectors
+        # rows past len(keys) are ignored, so the meta goes last
+        for offset, key in enumerate(missing):
+            row_of[key] = start + offset
+        meta["keys"].extend(missing)
+        _save_meta(store_dir, meta)
+
+    if not texts:
+        return np.empty((0, meta["dim"] or 0), dtype=np.float32)
+    _, stored = load_vectors(store_dir)
+    return np.asarray(stored[[row_of[key] for key in keys]], dtype=np.float32)
+
+
+def load_speeches(path, column="speech"):
+    """
+    The text column of a compiled corpus (CSV file or Parquet dataset).
+    """
+    import pandas as pd
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        texts = pd.read_parquet(path, columns=[column])[column]
+    else:
+        texts = pd.read_csv(path, usecols=[column])[column]
+    return texts.fillna("").astype(str).tolist()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embed the compiled speech corpus into a persistent store.")
+    parser.add_argument("corpus", help="compiled_speeches.csv or the Parquet dataset folder")
+    parser.add_argument("store_dir", help="embedding store folder")
+    parser.add_argument("--column", default="speech", help="text column to embed")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--dtype", choices=["float16", "float32"], default=DEFAULT_DTYPE,
+                        help="storage type of new stores (float16 halves the disk/RAM)")
+    args = parser.parse_args()
+
+    texts = load_speeches(args.corpus, args.column)
+    print(f"📊 {len(texts)} speeches in {args.corpus}")
+    vectors = embed_texts(texts, args.store_dir, model_name=args.model,
+                          batch_size=args.batch_size, dtype=args.dtype)
+    print(f"✅ Done! {vectors.shape[0]} vectors of dim {vectors.shape[1]} available in:\n{args.store_dir}")
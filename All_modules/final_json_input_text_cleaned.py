@@ -2,7 +2,7 @@
 📜 Parliament Debate OCR → Clean JSON Pipeline (Hindi + English, Windows)
 """
 
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 import pytesseract
 import re
 import json
@@ -20,15 +20,21 @@ pytesseract.pytesseract.tesseract_cmd = tesseract_path
 # ======================================
 # STEP 1: OCR PDF → Raw Text
 # ======================================
-def run_ocr(pdf_path, output_path):
+def run_ocr(pdf_path, output_path, chunk_size=8):
+    # Rasterize chunk_size pages at a time so memory does not grow with page count
     print("🔄 Converting PDF to images...")
-    pages = convert_from_path(pdf_path, dpi=300, poppler_path=poppler_path)
+    total_pages = pdfinfo_from_path(pdf_path, poppler_path=poppler_path)["Pages"]
     all_text = ""
 
-    for i, page in enumerate(pages):
-        print(f"🔍 OCR Processing page {i+1}/{len(pages)}...")
-        text = pytesseract.image_to_string(page, lang="hin+eng")
-        all_text += f"\n\n--- Page {i+1} ---\n\n{text.strip()}"
+    for first in range(1, total_pages + 1, chunk_size):
+        last = min(first + chunk_size - 1, total_pages)
+        pages = convert_from_path(pdf_path, dpi=300, first_page=first, last_page=last,
+                                  poppler_path=poppler_path)
+        for i, page in enumerate(pages, start=first):
+            print(f"🔍 OCR Processing page {i}/{total_pages}...")
+            text = pytesseract.image_to_string(page, lang="hin+eng")
+            all_text += f"\n\n--- Page {i} ---\n\n{text.strip()}"
+        del pages
 
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(all_text)
@@ -0,0 +1,60 @@
+# jsonl_io.py
+# JSON Lines (NDJSON) helpers for the speech intermediates.
+# - One JSON value per line, so stages read and write one record at a time
+#   instead of json.load / json.dump(indent=4) of the whole list.
+# - "-" means stdin/stdout, so stage 5 can start while stage 4 is still running:
+#   python 4_speaker_wise.py "cleaned.txt" - | python 5_object_making.py - "final.jsonl"
+
+import io
+import os
+import sys
+import json
+
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+
+
+def is_jsonl(path):
+    """
+    True for "-" (pipes always carry JSON Lines) and for .jsonl/.ndjson paths.
+    """
+    return str(path) == "-" or str(path).lower().endswith(JSONL_EXTENSIONS)
+
+
+def iter_jsonl(path):
+    """
+    Yield the records of a JSON Lines file (or stdin for "-") one by one.
+    Blank lines are skipped.
+    """
+    if str(path) == "-":
+        f = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+    else:
+        f = open(path, "r", encoding="utf-8")
+    with f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_jsonl(path, records):
+    """
+    Write records as JSON Lines while they are produced, to stdout for "-" or
+    atomically (.part + rename) to a file. Returns the number of records written.
+    """
+    count = 0
+    if str(path) == "-":
+        out = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+        out.flush()
+        out.detach()
+        return count
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = str(path) + ".part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    os.replace(tmp_path, path)
+    return count
@@ -0,0 +1,129 @@
+# ocr_cache.py
+# On-disk cache of OCR text per PDF page, shared by every run of 1_reading.py.
+# - Keyed on the PDF's content hash + page number + DPI + language + Tesseract version,
+#   so renamed folders and duplicate downloads of the same sitting hit the cache.
+# - Entries are written atomically (temp file + rename): a crash never leaves a half entry.
+# - Size-bounded: least recently used entries are evicted once the cache grows past max_bytes.
+#   The cache is walked once per process; after that a running size total decides
+#   whether eviction (a new walk) is needed at all.
+
+import os
+import hashlib
+import tempfile
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB of page text is several hundred thousand pages
+# an over-full cache is trimmed to this fraction of max_bytes, so a cache kept full
+# is not walked again after every PDF
+EVICT_TARGET = 0.9
+
+# cache folder → bytes of entries, as last walked by evict_lru and then kept up to
+# date by this process's cache_put (entries written by other processes are
+# counted at the next walk)
+_known_sizes = {}
+
+
+def file_sha256(path, block_size=1024 * 1024):
+    """
+    Hash a file's bytes in blocks (PDFs can be large, never read them whole).
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def page_cache_key(pdf_hash, page_num, dpi, lang, engine_version):
+    """
+    Build the cache key of one OCR'd page. Any change in the inputs that could
+    change Tesseract's output gives a different key.
+    """
+    raw = f"{pdf_hash}|page={page_num}|dpi={dpi}|lang={lang}|tesseract={engine_version}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _entry_path(cache_dir, key):
+    # fan out over 256 sub-folders so no single directory gets huge
+    return os.path.join(cache_dir, key[:2], key + ".txt")
+
+
+def cache_get(cache_dir, key):
+    """
+    Return the cached text for key, or None on a miss.
+    A hit refreshes the entry's mtime, which is what LRU eviction orders by.
+    """
+    path = _entry_path(cache_dir, key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        os.utime(path)
+        return text
+    except OSError:
+        return None
+
+
+def cache_put(cache_dir, key, text):
+    """
+    Store text under key. Written to a temp file in the same folder and then
+    renamed, so readers only ever see complete entries.
+    """
+    path = _entry_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        size = os.path.getsize(tmp_path)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    known = os.path.abspath(cache_dir)
+    if known in _known_sizes:
+        _known_sizes[known] += size - old_size
+
+
+def evict_lru(cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Once the cache is over max_bytes, delete least recently used entries until it
+    is back under EVICT_TARGET * max_bytes. Returns the number of entries removed.
+    The cache is only walked (and stat'ed entry by entry) the first time in a
+    process, or when the running total of cache_put writes goes over max_bytes.
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+    known = os.path.abspath(cache_dir)
+    if _known_sizes.get(known, max_bytes + 1) <= max_bytes:
+        return 0
+
+    entries = []
+    total = 0
+    for dirpath, _, filenames in os.walk(cache_dir):
+        for fname in filenames:
+            if not fname.endswith(".txt"):
+                continue
+            fpath = os.path.join(dirpath, fname)
+            try:
+                st = os.stat(fpath)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, fpath))
+            total += st.st_size
+
+    removed = 0
+    if total > max_bytes:
+        entries.sort()  # oldest access first
+        for _, size, fpath in entries:
+            if total <= max_bytes * EVICT_TARGET:
+                break
+            try:
+                os.remove(fpath)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+    _known_sizes[known] = total
+    return removed
@@ -0,0 +1,386 @@
+# pipeline.py
+# In-process runner for the five pipeline stages:
+#   1_reading → 2_cropping → 3_cleaner → 4_speaker_wise → 5_object_making
+# Every stage module is imported once and text/objects are handed from stage to
+# stage in memory, instead of one `python <script>` launch and one temp file per stage.
+# Intermediate files are only written when asked for (debugging); the speech
+# list is kept as JSON Lines (one segment per line, see jsonl_io.py).
+# run_pipeline_incremental instead keeps every stage output plus a manifest of
+# input hash + stage version (STAGE_VERSION of the module), and on reruns recomputes only the stages whose
+# input or code changed (e.g. a 3_cleaner.py tweak reruns stages 3-5, not OCR).
+
+# ✅ Usage:
+# python pipeline.py "input.pdf" "output_final.json"
+# python pipeline.py "input.pdf" "output_final.json" --intermediates-dir "debug_out"
+# python pipeline.py "fullday.pdf" "output_final.json" --all-debates
+# python pipeline.py "input.pdf" "output_final.json" --incremental "OCR_Outputs"
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import importlib
+
+# the stage scripts have numeric names, so they can only be imported through importlib
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+reading = importlib.import_module("1_reading")
+cropping = importlib.import_module("2_cropping")
+cleaner = importlib.import_module("3_cleaner")
+speaker_wise = importlib.import_module("4_speaker_wise")
+object_making = importlib.import_module("5_object_making")
+from ocr_cache import file_sha256
+from jsonl_io import write_jsonl
+
+# stage folder names used under OCR_Outputs by the orchestrators
+STAGE_DIRS = {
+    "ocr": "1_ocr",
+    "debate": "2_debate_extracted",
+    "cleaned": "3_cleaned",
+    "speeches": "4_speeches_list",
+    "final": "5_speech_objects",
+}
+MANIFEST_DIR = "manifests"
+
+
+def stage_output_paths(output_root, base_name):
+    """
+    Paths of every stage output for one PDF, following the orchestrators' naming scheme.
+    """
+    return {
+        "ocr": os.path.join(output_root, STAGE_DIRS["ocr"], f"{base_name}.txt"),
+        "debate": os.path.join(output_root, STAGE_DIRS["debate"], f"{base_name}_debate.txt"),
+        "cleaned": os.path.join(output_root, STAGE_DIRS["cleaned"], f"{base_name}_cleaned.txt"),
+        "speeches": os.path.join(output_root, STAGE_DIRS["speeches"], f"{base_name}_speeches.jsonl"),
+        "final": os.path.join(output_root, STAGE_DIRS["final"], f"{base_name}_final.json"),
+    }
+
+
+def _write_text(path, text):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _write_json(path, data):
+    _write_text(path, json.dumps(data, ensure_ascii=False, indent=4))
+
+
+def run_pipeline(pdf_path, final_output=None, intermediate_paths=None, workers=1,
+                 chunk_size=reading.OCR_CHUNK_PAGES, use_text_layer=True,
+                 cache_dir=reading.ocr_cache_dir, multi_debate=False, ocr_text_path=None):
+    """
+    Run all five stages on one PDF and return the list of speech objects.
+
+    final_output: where to save the speech objects (skipped if None).
+    intermediate_paths: optional dict with any of "ocr", "debate", "cleaned",
+        "speeches" → path; only those stage outputs are written to disk.
+    multi_debate: full-day transcripts; every debate block found by
+        2_cropping.iter_debate_blocks goes through stages 3-5 as soon as it is cut,
+        and its speech objects also get "debate", "start_page" and "end_page".
+    ocr_text_path: an existing stage-1 output (1_ocr/<base>.txt); when the file
+        exists OCR is skipped and stages 2-5 run from its text.
+    The OCR output is written with its per-page sources (<base>_pages.json), as 1_reading does.
+    Raises on failure so callers can decide to skip, retry or quarantine the file.
+    """
+    if not os.path.exists(pdf_path):
+        raise FileNotFoundError(f"Input file not found: {pdf_path}")
+    intermediate_paths = intermediate_paths or {}
+
+    if ocr_text_path and os.path.exists(ocr_text_path):
+        print(f"✅ OCR already done, reusing: {ocr_text_path}")
+        with open(ocr_text_path, "r", encoding="utf-8") as f:
+            ocr_text = f.read()
+    else:
+        print("🔤 STEP 1: Performing OCR...")
+        ocr_text, page_sources = reading.ocr_pdf_text(pdf_path, workers=workers, chunk_size=chunk_size,
+                                                      use_text_layer=use_text_layer, cache_dir=cache_dir)
+        if "ocr" in intermediate_paths:
+            _write_text(intermediate_paths["ocr"], ocr_text)
+            _write_json(reading.page_sources_path(intermediate_paths["ocr"]), page_sources)
+
+    if multi_debate:
+        speech_objects = _run_debate_blocks(ocr_text, intermediate_paths)
+    else:
+        print("📝 STEP 2: Extracting debate content...")
+        debate_text = cropping.crop_debate_text(ocr_text)
+        del ocr_text
+        if "debate" in intermediate_paths:
+            _write_text(intermediate_paths["debate"], debate_text)
+
+        print("🧹 STEP 3: Cleaning text...")
+        cleaned_text = cleaner.clean_text(debate_text)
+        del debate_text
+        if "cleaned" in intermediate_paths:
+            _write_text(intermediate_paths["cleaned"], cleaned_text)
+
+        print("👥 STEP 4: Segmenting speeches by speaker...")
+        speeches = list(speaker_wise.iter_speech_segments(cleaned_text))
+        del cleaned_text
+        if "speeches" in intermediate_paths:
+            write_jsonl(intermediate_paths["speeches"], speeches)
+
+        print("🎯 STEP 5: Creating speech objects...")
+        speech_objects = object_making.make_speech_objects(speeches)
+        print(f"✅ {len(speeches)} speeches → {len(speech_objects)} speech objects.")
+
+    if final_output:
+        _write_json(final_output, speech_objects)
+
+    return speech_objects
+
+
+def _run_debate_blocks(ocr_text, intermediate_paths):
+    """
+    Stages 2-5 in multi-debate mode: stream each debate block through cleaning,
+    segmentation and object making. Intermediate files hold all blocks, in order.
+    """
+    print("📝 STEP 2-5: Extracting every debate block and processing it...")
+    kept = {name: [] for name in ("debate", "cleaned", "speeches") if name in intermediate_paths}
+    speech_objects = []
+    for block in cropping.iter_debate_blocks(ocr_text):
+        cleaned_text = cleaner.clean_text(block["text"])
+        speeches = list(speaker_wise.iter_speech_segments(cleaned_text))
+        objects = object_making.make_speech_objects(speeches)
+        for obj in objects:
+            obj.update(debate=block["debate"], start_page=block["start_page"], end_page=block["end_page"])
+        speech_objects.extend(objects)
+        print(f"✅ Debate {block['debate']} (pages {block['start_page']}-{block['end_page']}): "
+              f"{len(speeches)} speeches → {len(objects)} speech objects.")
+
+        if "debate" in kept:
+            kept["debate"].append(block["text"])
+        if "cleaned" in kept:
+            kept["cleaned"].append(cleaned_text)
+        if "speeches" in kept:
+            kept["speeches"].extend(speeches)
+
+    if "debate" in kept:
+        _write_text(intermediate_paths["debate"], "\n\n".join(kept["debate"]))
+    if "cleaned" in kept:
+        _write_text(intermediate_paths["cleaned"], "\n\n".join(kept["cleaned"]))
+    if "speeches" in kept:
+        write_jsonl(intermediate_paths["speeches"], kept["speeches"])
+    return speech_objects
+
+
+def _sha256_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _output_unchanged(out_path, entry):
+    """
+    True if a stage output file still is the one recorded in its manifest entry:
+    same size and mtime, or, if only the mtime moved, the same sha256 (the entry's
+    mtime is then updated in place). Any other edit means the stage is rebuilt.
+    """
+    if not os.path.exists(out_path):
+        return False
+    stat = os.stat(out_path)
+    if stat.st_size != entry.get("output_size"):
+        return False
+    if stat.st_mtime == entry.get("output_mtime"):
+        return True
+    if file_sha256(out_path) != entry.get("output_file_sha256"):
+        return False
+    entry["output_mtime"] = stat.st_mtime  # touched, not changed
+    return True
+
+
+def _output_entry(out_path, input_hash, version, output_hash):
+    """
+    Manifest entry of a stage output just written (or adopted) at out_path.
+    """
+    stat = os.stat(out_path)
+    return {
+        "input_hash": input_hash,
+        "version": version,
+        "output_hash": output_hash,
+        "output_size": stat.st_size,
+        "output_mtime": stat.st_mtime,
+        "output_file_sha256": file_sha256(out_path),
+    }
+
+
+def _stage_version(module, *config):
+    """
+    Version of a stage = the STAGE_VERSION constant of its module plus any settings
+    that change its output. Edits that keep the output (comments, speed-ups) do not
+    invalidate the stage; a change of output must bump STAGE_VERSION.
+    """
+    return "|".join(str(value) for value in (module.STAGE_VERSION, *config))
+
+
+def _dump_json(data):
+    return json.dumps(data, ensure_ascii=False, indent=4)
+
+
+def _load_json(text):
+    return json.loads(text)
+
+
+def _dump_jsonl(records):
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+def _load_jsonl(text):
+    return [json.loads(line) for line in text.split("\n") if line.strip()]
+
+
+def _identity(text):
+    return text
+
+
+def _segment_speeches(text):
+    return list(speaker_wise.iter_speech_segments(text))
+
+
+def stage_versions(use_text_layer=True):
+    """
+    Current code/config version of every stage, in pipeline order.
+    """
+    return {
+        "ocr": _stage_version(reading, reading.OCR_DPI, reading.OCR_LANG,
+                              reading.MIN_TEXT_LAYER_CHARS, use_text_layer),
+        "debate": _stage_version(cropping),
+        "cleaned": _stage_version(cleaner),
+        "speeches": _stage_version(speaker_wise),
+        "final": _stage_version(object_making),
+    }
+
+
+def run_pipeline_incremental(pdf_path, paths, manifest_path, workers=1,
+                             chunk_size=reading.OCR_CHUNK_PAGES, use_text_layer=True,
+                             cache_dir=reading.ocr_cache_dir):
+    """
+    Build-system style run of one PDF. Every stage output is kept at paths[stage]
+    and manifest_path records, per stage, the hash of its input, the stage version
+    and the hash/size of its output. A stage is recomputed only if its input hash
+    or version changed or its output file is missing/altered; since a stage's input
+    hash is the previous stage's output hash, a rerun that reproduces the same text
+    stops invalidating the stages after it. Without a manifest, an OCR output
+    already at paths["ocr"] is adopted rather than redone.
+    Returns (speech_objects or None if nothing was recomputed, list of rebuilt stages).
+    """
+    if not os.path.exists(pdf_path):
+        raise FileNotFoundError(f"Input file not found: {pdf_path}")
+
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    versions = stage_versions(use_text_layer)
+
+    def ocr_stage(pdf):
+        ocr_text, page_sources = reading.ocr_pdf_text(pdf, workers=workers, chunk_size=chunk_size,
+                                                      use_text_layer=use_text_layer, cache_dir=cache_dir)
+        _write_json(reading.page_sources_path(paths["ocr"]), page_sources)
+        return ocr_text
+
+    # (name, message, function, serialize, deserialize)
+    stages = [
+        ("ocr", "🔤 STEP 1: Performing OCR...", ocr_stage, _identity, _identity),
+        ("debate", "📝 STEP 2: Extracting debate content...", cropping.crop_debate_text, _identity, _identity),
+        ("cleaned", "🧹 STEP 3: Cleaning text...", cleaner.clean_text, _identity, _identity),
+        ("speeches", "👥 STEP 4: Segmenting speeches by speaker...", _segment_speeches,
+         _dump_jsonl, _load_jsonl),
+        ("final", "🎯 STEP 5: Creating speech objects...", object_making.make_speech_objects,
+         _dump_json, _load_json),
+    ]
+
+    # stage 1's input is the PDF itself
+    input_hash = file_sha256(pdf_path)
+    stage_input = pdf_path  # loaded lazily: None means "read the previous stage's file"
+    result = None
+    rebuilt = []
+
+    for i, (name, message, func, serialize, deserialize) in enumerate(stages):
+        entry = dict(manifest.get(name, {}))
+        out_path = paths[name]
+        if name == "ocr" and not entry and os.path.exists(out_path):
+            # first --incremental run over an existing output folder: adopt the OCR
+            # text already there instead of OCRing the PDF again
+            with open(out_path, "r", encoding="utf-8") as f:
+                entry = _output_entry(out_path, input_hash, versions[name], _sha256_text(f.read()))
+            manifest[name] = entry
+            _write_text(manifest_path, _dump_json(manifest))
+            print(f"♻️ Adopting existing OCR output: {out_path}")
+        up_to_date = (
+            entry.get("input_hash") == input_hash
+            and entry.get("version") == versions[name]
+            and _output_unchanged(out_path, entry)
+        )
+        if up_to_date:
+            if entry != manifest[name]:
+                manifest[name] = entry
+                _write_text(manifest_path, _dump_json(manifest))
+            print(f"✅ {name} up to date, skipping...")
+            input_hash = entry["output_hash"]
+            stage_input = None
+            continue
+
+        if stage_input is None:
+            prev_name, _, _, _, prev_deserialize = stages[i - 1]
+            with open(paths[prev_name], "r", encoding="utf-8") as f:
+                stage_input = prev_deserialize(f.read())
+
+        print(message)
+        result = func(stage_input)
+        serialized = serialize(result)
+        _write_text(out_path, serialized)
+        rebuilt.append(name)
+
+        manifest[name] = _output_entry(out_path, input_hash, versions[name], _sha256_text(serialized))
+        # save after every stage so an interrupted run keeps the work already done
+        _write_text(manifest_path, _dump_json(manifest))
+
+        input_hash = manifest[name]["output_hash"]
+        stage_input = result
+
+    return (result if rebuilt and rebuilt[-1] == "final" else None), rebuilt
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the whole PDF → speech objects pipeline in one process.")
+    parser.add_argument("input_pdf", help="path of the debate PDF")
+    parser.add_argument("output_json", help="path of the final speech-objects JSON")
+    parser.add_argument("--intermediates-dir",
+                        help="also write every stage's output into this folder (for debugging)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="pages to OCR in parallel (default: all cores)")
+    parser.add_argument("--all-debates", action="store_true",
+                        help="full-day transcripts: process every debate block, not only the first")
+    parser.add_argument("--incremental", metavar="OUTPUT_ROOT",
+                        help="keep stage outputs and a manifest under OUTPUT_ROOT and rebuild only what changed")
+    args = parser.parse_args()
+    if args.incremental and args.all_debates:
+        parser.error("--all-debates cannot be combined with --incremental")
+
+    if args.incremental:
+        base_name = os.path.splitext(os.path.basename(args.input_pdf))[0]
+        paths = stage_output_paths(args.incremental, base_name)
+        paths["final"] = args.output_json
+        manifest_path = os.path.join(args.incremental, MANIFEST_DIR, f"{base_name}.json")
+        try:
+            _, rebuilt = run_pipeline_incremental(args.input_pdf, paths, manifest_path, workers=args.workers)
+            print(f"✅ Done! Rebuilt stages: {', '.join(rebuilt) or 'none'}")
+        except Exception as e:
+            print(f"❌ Error during pipeline: {e}")
+            sys.exit(1)
+        sys.exit(0)
+
+    intermediate_paths = None
+    if args.intermediates_dir:
+        base_name = os.path.splitext(os.path.basename(args.input_pdf))[0]
+        intermediate_paths = stage_output_paths(args.intermediates_dir, base_name)
+
+    try:
+        run_pipeline(args.input_pdf, args.output_json, intermediate_paths, workers=args.workers,
+                     multi_debate=args.all_debates)
+        print(f"✅ Done! Speech objects saved to:\n{args.output_json}")
+    except Exception as e:
+        print(f"❌ Error during pipeline: {e}")
+        sys.exit(1)
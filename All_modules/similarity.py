@@ -0,0 +1,145 @@
+# similarity.py
+# Cosine similarity over the speech embeddings without the dense N x N matrix.
+# - Vectors are L2-normalized once, then compared one block of rows at a time
+#   (block x N scores), so memory stays bounded whatever the corpus size.
+# - Only the top-k neighbours of every speech (or the pairs above a threshold)
+#   are kept, as arrays or a scipy sparse matrix.
+# - neighbourhood_matrix gives the small dense matrix of one neighbourhood, for
+#   clustermaps / manual verification instead of similarity_df over everything.
+
+# ✅ Usage:
+# python similarity.py "embeddings" "neighbours.npz" --k 20
+#
+# From the notebook:
+#   ids, scores = top_k_neighbours(X, k=20)            # (N, 20) each
+#   graph = neighbours_to_sparse(ids, scores)          # N x N sparse, 20 entries per row
+#   sub = neighbourhood_matrix(X, neighbourhood(ids, 42))  # dense, ~20 x 20
+#   sns.clustermap(sub, cmap="viridis")
+
+import argparse
+import numpy as np
+
+# scores held at once per block (block_rows x N); 32M float32 = 128 MB
+BLOCK_ELEMENTS = 32 * 1024 * 1024
+
+
+def normalize_rows(X):
+    """
+    float32 copy of X with every row scaled to unit length (zero rows stay zero).
+    """
+    X = np.asarray(X, dtype=np.float32)
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return X / norms
+
+
+def _block_rows(n, block_rows):
+    return block_rows or max(1, BLOCK_ELEMENTS // max(n, 1))
+
+
+def iter_similarity_blocks(X, block_rows=None, normalized=False):
+    """
+    Yield (start, scores) with scores = cosine similarity of rows
+    start..start+len(scores) against all rows, one bounded block at a time.
+    """
+    Xn = X if normalized else normalize_rows(X)
+    n = Xn.shape[0]
+    step = _block_rows(n, block_rows)
+    for start in range(0, n, step):
+        yield start, Xn[start:start + step] @ Xn.T
+
+
+def top_k_neighbours(X, k=10, block_rows=None, exclude_self=True):
+    """
+    The k most similar speeches of every speech.
+    Returns (ids, scores), both (N, k), sorted by decreasing similarity.
+    """
+    Xn = normalize_rows(X)
+    n = Xn.shape[0]
+    k = min(k, n - 1 if exclude_self else n)
+    ids = np.empty((n, k), dtype=np.int64)
+    scores = np.empty((n, k), dtype=np.float32)
+    if k <= 0:
+        return ids, scores
+
+    for start, block in iter_similarity_blocks(Xn, block_rows, normalized=True):
+        rows = np.arange(block.shape[0])
+        if exclude_self:
+            block[rows, start + rows] = -np.inf
+        # unordered top-k in O(N) per row, then sort only those k
+        part = np.argpartition(block, -k, axis=1)[:, -k:]
+        part_scores = block[rows[:, None], part]
+        order = np.argsort(-part_scores, axis=1)
+        ids[start:start + len(rows)] = part[rows[:, None], order]
+        scores[start:start + len(rows)] = part_scores[rows[:, None], order]
+    return ids, scores
+
+
+def pairs_above(X, threshold, block_rows=None):
+    """
+    Every pair (i, j), i < j, with cosine similarity >= threshold, as a
+    scipy.sparse.coo_matrix (N x N, upper triangle).
+    """
+    from scipy import sparse
+
+    n = X.shape[0]
+    rows, cols, vals = [], [], []
+    for start, block in iter_similarity_blocks(X, block_rows):
+        r, c = np.nonzero(block >= threshold)
+        r = r + start
+        keep = c > r
+        rows.append(r[keep])
+        cols.append(c[keep])
+        vals.append(block[r[keep] - start, c[keep]])
+    if not rows:
+        return sparse.coo_matrix((n, n), dtype=np.float32)
+    return sparse.coo_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                             shape=(n, n))
+
+
+def neighbours_to_sparse(ids, scores):
+    """
+    Top-k result as an N x N scipy.sparse.csr_matrix (row i holds i's neighbours).
+    """
+    from scipy import sparse
+
+    n, k = ids.shape
+    indptr = np.arange(0, n * k + 1, k)
+    return sparse.csr_matrix((scores.ravel(), ids.ravel(), indptr), shape=(n, n))
+
+
+def neighbourhood(ids, center, hops=1):
+    """
+    Sorted ids of `center` and its neighbours up to `hops` steps away in the top-k graph.
+    """
+    members = {center}
+    frontier = [center]
+    for _ in range(hops):
+        frontier = [j for i in frontier for j in ids[i] if j not in members]
+        members.update(frontier)
+    return sorted(int(i) for i in members)
+
+
+def neighbourhood_matrix(X, members):
+    """
+    Dense cosine similarity of just these speeches (len(members) x len(members)).
+    """
+    Xn = normalize_rows(np.asarray(X)[members])
+    return Xn @ Xn.T
+
+
+if __name__ == "__main__":
+    from embedding_store import load_vectors
+
+    parser = argparse.ArgumentParser(description="Top-k cosine neighbours of every vector in an embedding store.")
+    parser.add_argument("store_dir", help="embedding store folder (see embedding_store.py)")
+    parser.add_argument("output", help="output .npz with keys, ids and scores")
+    parser.add_argument("--k", type=int, default=10, help="neighbours kept per speech")
+    parser.add_argument("--block-rows", type=int, help="rows compared at once (default: fit ~128 MB)")
+    args = parser.parse_args()
+
+    keys, vectors = load_vectors(args.store_dir)
+    print(f"🔍 Finding top-{args.k} neighbours of {len(keys)} speeches...")
+    ids, scores = top_k_neighbours(vectors, k=args.k, block_rows=args.block_rows)
+    np.savez(args.output, keys=np.array(keys), ids=ids, scores=scores)
+    print(f"✅ Done! Neighbours saved to:\n{args.output}")
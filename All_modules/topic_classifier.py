@@ -0,0 +1,218 @@
+# topic_classifier.py
+# Topic labelling of the compiled speeches through a local model server (ollama HTTP API).
+# - Replaces one `ollama run llama3.2` subprocess per speech: every worker thread
+#   keeps one persistent (keep-alive) HTTP connection to the server, and at most
+#   --workers requests are in flight at a time (2 x workers prompts queued).
+# - Each request has a timeout and is retried with exponential backoff on
+#   connection errors, timeouts and 5xx answers.
+# - Every label is appended to a JSON Lines checkpoint as soon as it arrives
+#   (keyed by the sha256 of the speech text), so an interrupted run resumes
+#   with the speeches not labelled yet. Failed speeches are retried next run.
+# - The server is just a URL (--host), so a stub server on localhost works for testing.
+
+# ✅ Usage:
+# python topic_classifier.py "compiled_speeches.csv" "topic_highlighted_speeches.csv"
+# python topic_classifier.py "compiled_speeches_parquet" "topics.csv" --workers 4 --min-words 30 --host http://localhost:11434
+
+import os
+import json
+import time
+import argparse
+import threading
+import http.client
+from urllib.parse import urlparse
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from embedding_store import text_key
+
+DEFAULT_HOST = "http://localhost:11434"
+DEFAULT_MODEL = "llama3.2"
+DEFAULT_WORKERS = 4
+DEFAULT_TIMEOUT = 120
+DEFAULT_RETRIES = 3
+BACKOFF_SECONDS = 1.0
+
+BASE_PROMPT = """
+You are an expert Indian Parliamentary proceedings topic classifier.
+Your job is NOT to summarize the speech. Your job is to identify what specific policy / issue / subject matter is being talked about in ONE short crisp category.
+
+Rules:
+- Return EXACTLY 1 topic phrase for each speech (7-12 words max)
+- If the speech is just procedural / rhetorical / filler / greeting → return "irrelevant"
+- Hindi, English, Hinglish all supported.
+- Make topics focused on meaning, not literal words.
+
+FORMAT:
+Topic: <short topic phrase>
+
+### Example:
+Speech Input:
+"National Commission for Religious and Linguistic Minorities… Dalit Christians and Dalit Muslims reservations extension…"
+
+Output:
+Topic: Reservation for Dalit Christians and Dalit Muslims
+
+"""
+
+
+def build_prompt(speech):
+    return BASE_PROMPT + f"\n\nSpeech Input:\n{speech}\n\nOutput:\n"
+
+
+class ServerError(Exception):
+    pass
+
+
+def make_client(host=DEFAULT_HOST, model=DEFAULT_MODEL, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES):
+    """
+    A thread-safe function prompt → generated text. Each thread reuses its own
+    keep-alive connection; a broken connection is reopened on the next attempt.
+    """
+    url = urlparse(host)
+    connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+    local = threading.local()
+
+    def post(body):
+        if getattr(local, "connection", None) is None:
+            local.connection = connection_class(url.hostname, url.port, timeout=timeout)
+        local.connection.request("POST", "/api/generate", body=body,
+                                 headers={"Content-Type": "application/json"})
+        response = local.connection.getresponse()
+        data = response.read()  # read fully so the connection can be reused
+        if response.status >= 500:
+            raise ServerError(f"HTTP {response.status}: {data[:200]!r}")
+        if response.status != 200:
+            raise ValueError(f"HTTP {response.status}: {data[:200]!r}")  # not retried
+        return json.loads(data)["response"]
+
+    def generate(prompt):
+        body = json.dumps({"model": model, "prompt": prompt, "stream": False}).encode("utf-8")
+        for attempt in range(retries + 1):
+            try:
+                return post(body)
+            except (OSError, http.client.HTTPException, ServerError) as e:
+                # a 5xx answer was read completely, so only network errors drop the connection
+                if not isinstance(e, ServerError) and getattr(local, "connection", None) is not None:
+                    local.connection.close()
+                    local.connection = None
+                if attempt == retries:
+                    raise
+                time.sleep(BACKOFF_SECONDS * 2 ** attempt)
+
+    return generate
+
+
+def load_checkpoint(path):
+    """
+    {speech key: topic} from a checkpoint; a line cut off by a crash is ignored.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[record["key"]] = record["topic"]
+    return done
+
+
+def classify_speeches(speeches, checkpoint_path, generate, workers=DEFAULT_WORKERS):
+    """
+    Topic of every speech (same order). Speeches already in the checkpoint are
+    not sent again; new labels are appended to it as they arrive. A speech that
+    still fails after the retries gets "Topic: ERROR ..." and is not checkpointed.
+    """
+    done = load_checkpoint(checkpoint_path)
+    keys = [text_key(speech) for speech in speeches]
+    todo = {}
+    for key, speech in zip(keys, speeches):
+        if key not in done and key not in todo:
+            todo[key] = speech
+    print(f"🧠 {len(todo)} speeches to label ({len(done)} already in the checkpoint)...")
+
+    errors = {}
+    started = time.perf_counter()
+    os.makedirs(os.path.dirname(os.path.abspath(checkpoint_path)), exist_ok=True)
+    # end a line cut off by a crash, so the next record starts on its own line
+    if os.path.exists(checkpoint_path) and os.path.getsize(checkpoint_path) > 0:
+        with open(checkpoint_path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    pending = iter(todo.items())
+    in_flight = {}  # future → speech key; at most 2 x workers prompts built and queued
+    count = 0
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            for key, speech in islice(pending, 2 * workers - len(in_flight)):
+                in_flight[pool.submit(generate, build_prompt(speech))] = key
+            if not in_flight:
+                break
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = in_flight.pop(future)
+                count += 1
+                try:
+                    output = future.result().strip()
+                except Exception as e:
+                    errors[key] = f"Topic: ERROR {str(e)}"
+                    print(f"❌ Error labelling speech {key[:12]}: {e}")
+                    continue
+                done[key] = output if output else "Topic: ERROR_EMPTY_OUTPUT"
+                checkpoint.write(json.dumps({"key": key, "topic": done[key]}, ensure_ascii=False) + "\n")
+                checkpoint.flush()
+                if count % 100 == 0:
+                    rate = count / (time.perf_counter() - started)
+                    print(f"📝 {count}/{len(todo)} labelled ({rate:.1f} speeches/s)")
+
+    if errors:
+        print(f"⚠️ {len(errors)} speeches failed; run again to retry them.")
+    return [done.get(key, errors.get(key)) for key in keys]
+
+
+def parse_topic(output):
+    """
+    The phrase after "Topic:" in a model answer (the whole answer if there is none).
+    """
+    for line in output.splitlines():
+        if line.strip().lower().startswith("topic:"):
+            return line.split(":", 1)[1].strip()
+    return output.strip()
+
+
+if __name__ == "__main__":
+    from ann_index import read_corpus
+
+    parser = argparse.ArgumentParser(description="Label every compiled speech with a topic via a local model server.")
+    parser.add_argument("corpus", help="compiled_speeches.csv or the Parquet dataset folder")
+    parser.add_argument("output", help="CSV with the corpus plus topic_highlight / topic columns")
+    parser.add_argument("--checkpoint", help="JSON Lines checkpoint (default: <output>.checkpoint.jsonl)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="model server URL")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="requests in flight at a time")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds per request")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--min-words", type=int, default=0, help="only label speeches longer than this")
+    parser.add_argument("--limit", type=int, help="only label the first N (selected) speeches")
+    args = parser.parse_args()
+
+    df = read_corpus(args.corpus)
+    df = df[df["speech"].str.split().str.len() > args.min_words]
+    if args.limit is not None:
+        df = df.head(args.limit)
+    df = df.copy()
+
+    generate = make_client(args.host, args.model, args.timeout, args.retries)
+    df["topic_highlight"] = classify_speeches(df["speech"].tolist(), args.checkpoint or args.output + ".checkpoint.jsonl",
+                                              generate, args.workers)
+    df["topic"] = df["topic_highlight"].map(parse_topic)
+
+    tmp_path = args.output + ".part"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, args.output)
+    print(f"✅ Done. File saved as {args.output}")
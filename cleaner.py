@@ -19,6 +19,12 @@ RE_HYPHEN_SLASH_FRAGMENT = re.compile(
     flags=re.UNICODE)   # remove -.../... fragments
 # remove any substring (up to a reasonable length) that contains at least one slash
 RE_ANY_CONTAIN_SLASH = re.compile(r'[A-Za-z0-9\-\./\s]{0,120}\/[A-Za-z0-9\-\./\s]{0,120}', flags=re.UNICODE)
+SLASH_SPAN = 120
+# lines up to this length use RE_ANY_CONTAIN_SLASH directly (measured: faster than the
+# linear remover below ~130 chars, much slower above on long dot/space runs)
+SLASH_REGEX_MAX_CHARS = SLASH_SPAN
+# maximal runs of the characters RE_ANY_CONTAIN_SLASH may span
+RE_SLASH_CHARSET_RUN = re.compile(r'[A-Za-z0-9\-\./\s]+', flags=re.UNICODE)
 
 # remove dotted noise patterns like ...(Interruptions)... or ...(व्यवधान)...
 RE_DOTTED_NOISE = re.compile(r'\.{2,}\s*\(?\s*(Interruptions|व्यवधान)\s*\)?\s*\.{0,}', flags=re.IGNORECASE | re.UNICODE)
@@ -40,6 +46,32 @@ RE_DUP_WORDS = re.compile(r'\b(\w+)(?:\s+\1\b)+', flags=re.IGNORECASE)
 RE_LONG_GARBAGE = re.compile(r'[^\w\s]{6,}', flags=re.UNICODE)
 
 
+def remove_slash_fragments(s: str) -> str:
+    """
+    Same result as RE_ANY_CONTAIN_SLASH.sub('', s), but linear time: the regex
+    backtracks up to 120 chars from every position of long dot/space runs.
+    (See All_modules/3_cleaner.py for how the match positions are derived.)
+    """
+    out = []
+    last = 0
+    for run in RE_SLASH_CHARSET_RUN.finditer(s):
+        run_start, run_end = run.span()
+        p = run_start
+        while p < run_end:
+            first_slash = s.find('/', p, run_end)
+            if first_slash == -1:
+                break
+            start = max(p, first_slash - SLASH_SPAN)
+            slash = s.rfind('/', start, min(start + SLASH_SPAN + 1, run_end))
+            end = slash + 1 + min(SLASH_SPAN, run_end - slash - 1)
+            out.append(s[last:start])
+            last = p = end
+    if last == 0:
+        return s
+    out.append(s[last:])
+    return ''.join(out)
+
+
 def clean_line_preserve_breaks(line: str) -> str:
     """
     Clean a single line and return the cleaned text (without newline).
@@ -53,7 +85,12 @@ def clean_line_preserve_breaks(line: str) -> str:
     s = RE_HYPHEN_SLASH_FRAGMENT.sub('', s)
 
     # 3) robust: remove any contiguous substring that contains a '/' (covers spaced variants)
-    s = RE_ANY_CONTAIN_SLASH.sub('', s)
+    # short lines: the regex is faster and its backtracking is bounded by the line;
+    # long lines: the linear remover (the regex is quadratic on long dot/space runs)
+    if len(s) <= SLASH_REGEX_MAX_CHARS:
+        s = RE_ANY_CONTAIN_SLASH.sub('', s)
+    else:
+        s = remove_slash_fragments(s)
 
     # 4) remove the noisy dotted parenthetical patterns like ...(Interruptions)...
     s = RE_DOTTED_NOISE.sub('', s)
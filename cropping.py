@@ -1,42 +1,100 @@
 import re
 
-def extract_debate(file_path, output_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        text = f.read()
+INTERRUPTION_MARKERS = ("(Interruptions)", "(व्यवधान)")
+END_MARKERS = ("(Ends)", "समाप्त")
+
+RE_PAGE_HEADER = re.compile(r"--- Page.*---")
+RE_INTERRUPTION = re.compile(r"\(Interruptions\)|\(व्यवधान\)")
+
+
+def find_debate_start(text):
+    """
+    Position where the debate starts: just after the last "(Ends)"/"समाप्त" that
+    precedes the first interruption marker; 0 if either marker is missing.
+    Plain forward/reverse substring searches, no regex over the prefix.
+    """
+    hits = [pos for pos in (text.find(m) for m in INTERRUPTION_MARKERS) if pos != -1]
+    if not hits:
+        return 0
+    first_interrupt_pos = min(hits)
+
+    # Trace backward to find the last "(Ends)" or "समाप्त" before this
+    start_pos = 0  # fallback to start if no end marker found
+    for marker in END_MARKERS:
+        pos = text.rfind(marker, 0, first_interrupt_pos)
+        if pos != -1:
+            start_pos = max(start_pos, pos + len(marker))
+    return start_pos
+
 
-    # Find the first interruption
-    interruption_match = re.search(r"\(Interruptions\)|\(व्यवधान\)", text)
-    
-    if interruption_match:
-        first_interrupt_pos = interruption_match.start()
-
-        # Trace backward to find the last "(Ends)" or "समाप्त" before this
-        pre_text = text[:first_interrupt_pos]
-        last_end_match = list(re.finditer(r"\(Ends\)|समाप्त", pre_text))
-        if last_end_match:
-            start_pos = last_end_match[-1].end()
+def crop_debate_text(text):
+    """
+    Cut the debate out of a raw OCR dump and strip page headers,
+    "Uncorrected" lines, interruption markers and blank-line runs.
+
+    Single scan over the lines of the debate, building the output once. Gives the
+    same result as the sequential passes it replaces:
+        strip → sub("--- Page.*---") → sub("Uncorrected.*\\n") → sub(interruptions)
+        → sub("\\n\\s*\\n", "\\n\\n") → strip
+    """
+    # bounds of text[start:].strip(), without copying
+    lo = find_debate_start(text)
+    hi = len(text)
+    while lo < hi and text[lo].isspace():
+        lo += 1
+    while hi > lo and text[hi - 1].isspace():
+        hi -= 1
+
+    pieces = []           # output, joined once at the end
+    logical = []          # parts of the current line ("Uncorrected..." cuts join it with the next one)
+    blank_gap = False     # whitespace-only lines seen since the last kept line
+    pos = lo
+    while pos < hi:
+        nl = text.find("\n", pos, hi)
+        line = text[pos:hi] if nl == -1 else text[pos:nl]
+        pos = hi if nl == -1 else nl + 1
+
+        # remove page headers
+        if "--- Page" in line:
+            line = RE_PAGE_HEADER.sub("", line)
+        # "Uncorrected..." up to and including the newline: the line continues on the next one
+        cut = line.find("Uncorrected") if nl != -1 else -1
+        if cut != -1:
+            logical.append(line[:cut])
+            continue
+        logical.append(line)
+        line = "".join(logical) if len(logical) > 1 else logical[0]
+        logical = []
+
+        # remove interruption markers from debate
+        if "(" in line:
+            line = RE_INTERRUPTION.sub("", line)
+
+        # runs of blank lines collapse to one empty line between kept lines
+        if not line or line.isspace():
+            blank_gap = True
+            continue
+        if pieces:
+            pieces.append("\n\n" if blank_gap else "\n")
         else:
-            start_pos = 0  # fallback to start if no end marker found
+            line = line.lstrip()
+        pieces.append(line)
+        blank_gap = False
 
-        # Extract debate text
-        debate_text = text[start_pos:].strip()
-    else:
-        # fallback: entire text if no interruptions
-        debate_text = text.strip()
+    if pieces:
+        pieces[-1] = pieces[-1].rstrip()
+    return "".join(pieces)
 
-    # Optional: remove page headers
-    debate_text = re.sub(r"--- Page.*---", "", debate_text)
-    debate_text = re.sub(r"Uncorrected.*\n", "", debate_text)
 
-    # Remove interruption markers from debate
-    debate_text = re.sub(r"\(Interruptions\)|\(व्यवधान\)", "", debate_text)
+def extract_debate(file_path, output_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        text = f.read()
 
-    # Remove extra blank lines
-    debate_text = re.sub(r"\n\s*\n", "\n\n", debate_text)
+    debate_text = crop_debate_text(text)
 
     # Save cleaned debate
     with open(output_path, "w", encoding="utf-8") as f:
-        f.write(debate_text.strip())
+        f.write(debate_text)
 
     print(f"Debate extracted to {output_path}")
 